@@ -1,14 +1,34 @@
 import os
+import time
+_IMPORT_T0 = time.perf_counter()
+
 from flask import Flask
 from .extensions import db, login_manager
 from flask_admin import Admin
-from .models import User
 from .blueprints.public.routes import public_bp
 from .blueprints.auth.routes import auth_bp
 from .admin_views import setup_admin,SecureAdminIndexView
 from .config import Config
+from .commands import register_commands
+from .images import responsive_attrs, hero_bg_vars
+from .assets import init_assets
+from .fragment_cache import init_template_caches
+from .search import register_search_events
+from .rich_text import register_rich_text_events
+from .media import register_media_events
+from .db_profiles import configured as configured_db, init_db_profile
+from .instrumentation import init_instrumentation
+from .content_versions import init_content_versions
+
+# Time spent importing the app package (Flask, SQLAlchemy, Flask-Admin, models, views)
+IMPORT_MS = (time.perf_counter() - _IMPORT_T0) * 1000
 
 def create_app():
+    """
+    Build the request-serving app. Touches no database: run `flask init-db`
+    once per deploy (or set AUTO_PROVISION=1 for local development).
+    """
+    t0 = time.perf_counter()
     app = Flask(__name__, instance_relative_config=True)
 
     # ✅ ensure instance folder exists
@@ -17,6 +37,9 @@ def create_app():
     app.config.from_object(Config())
 
     db.init_app(app)
+    init_db_profile(app, db)
+    init_instrumentation(app, db)
+    init_content_versions(app, db)
     login_manager.init_app(app)
 
     # Blueprints
@@ -35,23 +58,27 @@ def create_app():
     admin.add_link(MenuLink(name="Back to Website", url="/"))
 
     setup_admin(admin)
+    register_commands(app)
+    init_assets(app)
+
+    # Responsive image helpers for templates
+    app.jinja_env.globals.update(responsive_attrs=responsive_attrs, hero_bg_vars=hero_bg_vars)
+    init_template_caches(app)
+
+    register_search_events()
+    register_rich_text_events()
+    register_media_events()
 
-    with app.app_context():
-        db.create_all()
-        _seed_admin_user(app)
+    init_ms = (time.perf_counter() - t0) * 1000
+    app.extensions["startup"] = {"import_ms": round(IMPORT_MS, 1), "init_ms": round(init_ms, 1)}
+    app.logger.info("App ready: import %.0f ms, init %.0f ms (pid %s)", IMPORT_MS, init_ms, os.getpid())
+    app.logger.info("Database profile: %s", configured_db(app, db))
+
+    if app.config.get("AUTO_PROVISION"):
+        from .provision import provision
+        provision(app)
 
       #  from .seed_data import seed_if_empty
       #  seed_if_empty(app)
 
     return app
-
-
-def _seed_admin_user(app: Flask):
-    # Create a default admin account only if none exist (safe to run repeatedly)
-    if User.query.count() == 0:
-        email = app.config.get("ADMIN_EMAIL", "admin@saveetha.edu.in")
-        password = app.config.get("ADMIN_PASSWORD", "ChangeMe@123")
-        user = User(email=email, is_admin=True)
-        user.set_password(password)
-        db.session.add(user)
-        db.session.commit()
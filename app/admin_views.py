@@ -1,11 +1,22 @@
-from flask import redirect, url_for, request
+import os
+from datetime import datetime
+
+from flask import current_app, redirect, url_for, request, flash, Response, stream_with_context
 from flask_login import current_user
-from flask_admin import AdminIndexView
+from flask_admin import AdminIndexView, BaseView, expose
+from flask_admin.babel import gettext
+from flask_admin.helpers import get_redirect_target
 from app.models import HeroSlide
 from flask_admin.contrib.sqla import ModelView
 from wtforms.validators import DataRequired
+from werkzeug.utils import secure_filename
 
 from .extensions import db
+from . import backups, instrumentation
+from .signals import content_changed
+from .images import ensure_model_variants
+from .rich_text import derived_columns, ensure_embedded_variants
+from .exports import MIMETYPES as EXPORT_MIMETYPES, stream_query
 from .models import (
     User, SiteSettings, Page, Program, Faculty,
     News, Event, Achievement, FundedProject,
@@ -20,9 +31,54 @@ class SecureAdminIndexView(AdminIndexView):
     def inaccessible_callback(self, name, **kwargs):
         return redirect(url_for("auth.login", next=request.url))
 
+class MetricsView(BaseView):
+    """Per-endpoint latency and query counts from app/instrumentation.py."""
+
+    def is_accessible(self):
+        return current_user.is_authenticated and getattr(current_user, "is_admin", False)
+
+    def inaccessible_callback(self, name, **kwargs):
+        return redirect(url_for("auth.login", next=request.url))
+
+    @expose("/")
+    def index(self):
+        return self.render("admin/metrics.html", stats=instrumentation.snapshot())
+
+    @expose("/reset", methods=("POST",))
+    def reset(self):
+        instrumentation.reset()
+        return redirect(url_for(".index"))
+
+class BackupsView(BaseView):
+    """Database snapshots from app/backups.py; "Back up now" runs in a background thread."""
+
+    def is_accessible(self):
+        return current_user.is_authenticated and getattr(current_user, "is_admin", False)
+
+    def inaccessible_callback(self, name, **kwargs):
+        return redirect(url_for("auth.login", next=request.url))
+
+    @expose("/")
+    def index(self):
+        rows = [{"name": os.path.basename(p), "size": os.path.getsize(p),
+                 "created": datetime.fromtimestamp(os.path.getmtime(p))} for p in backups.snapshots()]
+        return self.render("admin/backups.html", snapshots=rows, directory=backups.backup_dir())
+
+    @expose("/run", methods=("POST",))
+    def run(self):
+        try:
+            backups.database_path()
+        except backups.BackupError as exc:
+            flash(str(exc), "danger")
+        else:
+            backups.backup_in_background(current_app._get_current_object())
+            flash("Backup started. Refresh in a moment to see the new snapshot.", "success")
+        return redirect(url_for(".index"))
+
 class SecureModelView(ModelView):
     page_size = 25
     can_export = True
+    export_types = ["csv", "jsonl", "csv.gz", "jsonl.gz"]
     create_modal = False
     edit_modal = False
     details_modal = False
@@ -30,19 +86,67 @@ class SecureModelView(ModelView):
     form_widget_args = {}
     form_widget_args ={}
 
+    def __init__(self, model, session, *args, **kwargs):
+        # Rendered rich-text columns are computed on save (app/rich_text.py): never edited or listed
+        derived = tuple(derived_columns(model))
+        if derived:
+            self.form_excluded_columns = tuple(self.form_excluded_columns or ()) + derived
+            self.column_exclude_list = tuple(self.column_exclude_list or ()) + derived
+            self.column_details_exclude_list = tuple(self.column_details_exclude_list or ()) + derived
+            self.column_export_exclude_list = tuple(self.column_export_exclude_list or ()) + derived
+        super().__init__(model, session, *args, **kwargs)
+
     def is_accessible(self):
         return current_user.is_authenticated and getattr(current_user, "is_admin", False)
 
     def inaccessible_callback(self, name, **kwargs):
         return redirect(url_for("auth.login", next=request.url))
 
+    # Let caches know the content changed (runs after commit)
+    def after_model_change(self, form, model, is_created):
+        super().after_model_change(form, model, is_created)
+
+        # Resized WebP copies of any uploaded/linked images (hero, faculty, gallery...)
+        # and of images embedded in rich text, which is then rendered again to use them
+        if ensure_model_variants(model) | ensure_embedded_variants(model):
+            db.session.commit()
+
+        content_changed.send(type(model), model=model)
+
+    def after_model_delete(self, model):
+        super().after_model_delete(model)
+        content_changed.send(type(model), model=model)
+
+    # Stream exports in chunks instead of building the whole file in memory
+    @expose("/export/<export_type>/")
+    def export(self, export_type):
+        return_url = get_redirect_target() or self.get_url(".index_view")
+        if not self.can_export or export_type not in self.export_types:
+            flash(gettext("Permission denied."), "error")
+            return redirect(return_url)
+
+        fmt, _, compress = export_type.partition(".")
+        view_args = self._get_list_extra_args()
+        sort_column = self._get_column_by_idx(view_args.sort)
+        if sort_column is not None:
+            sort_column = sort_column[0]
+        _count, query = self.get_list(0, sort_column, view_args.sort_desc, view_args.search,
+                                      view_args.filters, execute=False, page_size=self.export_max_rows)
+
+        chunks = stream_query(query, self._export_columns, fmt, compress=bool(compress),
+                              get_value=self.get_export_value)
+        filename = secure_filename(self.get_export_name(export_type))
+        return Response(stream_with_context(chunks),
+                        mimetype="application/gzip" if compress else EXPORT_MIMETYPES[fmt],
+                        headers={"Content-Disposition": f"attachment;filename={filename}"})
+
 def setup_admin(admin):
     admin.add_view(SecureModelView(SiteSettings, db.session, category="Settings")) 
     admin.add_view(HeroSlideAdmin(HeroSlide, db.session, category="Content"))
    # admin.add_view(SiteSettingsAdmin(SiteSettings, db.session, category="Settings")) # --Added 24JAn2026
     admin.add_view(SecureModelView(Page, db.session, category="Content"))
   #  admin.add_view(SecureModelView(Program, db.session, category="Academics"))
-    admin.add_view(SecureModelView(Faculty, db.session, category="Faculty"))
+    admin.add_view(FacultyView(Faculty, db.session, category="Faculty"))
 
     admin.add_view(SecureModelView(News, db.session, category="News & Media"))
     admin.add_view(SecureModelView(Event, db.session, category="News & Media"))
@@ -54,30 +158,30 @@ def setup_admin(admin):
     admin.add_view(SecureModelView(MoU, db.session, category="Industry"))
     admin.add_view(SecureModelView(PlacementStat, db.session, category="Industry"))
 
-    admin.add_view(SecureModelView(Enquiry, db.session, category="Enquiries"))
+    admin.add_view(EnquiryView(Enquiry, db.session, category="Enquiries"))
     admin.add_view(SecureModelView(User, db.session, category="Access"))
 
-    admin.add_view(SecureModelView(GalleryAlbum, db.session, category="Media"))
+    admin.add_view(GalleryAlbumView(GalleryAlbum, db.session, category="Media"))
     admin.add_view(GalleryImageView(GalleryImage, db.session, category="Media"))
  
    # admin.add_view(SecureModelView(Alumni, db.session, category="People"))
 
+    admin.add_view(MetricsView(name="Performance", endpoint="metrics_admin", category="Access"))
+    admin.add_view(BackupsView(name="Backups", endpoint="backups_admin", category="Access"))
+
 import os
-from flask import current_app, url_for
-from flask_admin import form
-from flask_admin.form.upload import ImageUploadField
+import tempfile
+from flask import current_app, url_for, flash
+from flask_admin import form, expose
+from flask_admin.model.template import EndpointLinkRowAction
+from .gallery_ingest import ingest_in_background
+from .media import MediaUploadField
 from werkzeug.utils import secure_filename
 
 # --- HeroSlide admin with image upload ---
 class HeroSlideAdmin(SecureModelView):
     form_extra_fields = {
-        "image_url": ImageUploadField(
-            "Slide Image",
-            base_path=lambda: os.path.join(current_app.root_path, "static", "images", "headers"),
-            url_relative_path="images/headers/",
-            namegen=lambda obj, file_data: secure_filename(file_data.filename),
-            allowed_extensions=("jpg", "jpeg", "png", "webp"),
-        )
+        "image_url": MediaUploadField("Slide Image"),
     }
 
     def on_model_change(self, form, model, is_created):
@@ -107,15 +211,9 @@ class FacultyView(SecureModelView):
         "email","phone","photo_url","bio_html","is_published",
     )
 
-    # Upload into: app/static/images/faculty/
+    # Uploads go to the content-addressed media store (app/media.py)
     form_extra_fields = {
-        "photo_url": ImageUploadField(
-            "Faculty Photo",
-            base_path=lambda: os.path.join(current_app.root_path, "static", "images", "faculty"),
-            url_relative_path="images/faculty/",
-            namegen=lambda obj, file_data: secure_filename(file_data.filename),
-            allowed_extensions=("jpg", "jpeg", "png", "webp"),
-        )
+        "photo_url": MediaUploadField("Faculty Photo"),
     }
 
     def on_model_change(self, form, model, is_created):
@@ -134,6 +232,37 @@ class FacultyView(SecureModelView):
 
         super().on_model_change(form, model, is_created)
 
+class GalleryAlbumView(SecureModelView):
+    # "Bulk upload" icon on every album row
+    column_extra_row_actions = [
+        EndpointLinkRowAction("fa fa-upload", ".bulk_upload", title="Bulk upload photos"),
+    ]
+
+    @expose("/bulk-upload/<int:id>/", methods=("GET", "POST"))
+    def bulk_upload(self, id):
+        album = db.session.get(GalleryAlbum, id)
+        if album is None:
+            flash("Album not found.", "danger")
+            return redirect(url_for(".index_view"))
+
+        if request.method == "POST":
+            files = [f for f in request.files.getlist("photos") if f and f.filename]
+            if not files:
+                flash("Choose photos or a .zip file to upload.", "warning")
+                return redirect(url_for(".bulk_upload", id=id))
+
+            # Spool to a temp folder, then decode/resize in a process pool off the request thread
+            upload_dir = tempfile.mkdtemp(prefix="gallery-upload-")
+            for i, f in enumerate(files):
+                f.save(os.path.join(upload_dir, f"{i:05d}-{secure_filename(f.filename) or 'upload'}"))
+            ingest_in_background(current_app._get_current_object(), album.id, upload_dir, cleanup=True)
+
+            flash(f"Processing {len(files)} file(s) for '{album.title}'. Photos appear in a few minutes.", "success")
+            return redirect(url_for(".index_view"))
+
+        return self.render("admin/gallery_bulk_upload.html", album=album)
+
+
 class GalleryImageView(SecureModelView):
     form_columns = ("album", "image_url", "caption")
     form_args = {
@@ -141,6 +270,94 @@ class GalleryImageView(SecureModelView):
         "image_url": {"validators": [DataRequired()]},
     }
 
+
+# --- Large tables: keyset paging, capped counts, query-time budget ---
+from urllib.parse import urlencode
+from flask_admin.contrib.sqla.filters import FilterEqual
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from .db_profiles import time_budget
+from .pagination import keyset_paginate
+
+class LargeTableModelView(SecureModelView):
+    """
+    List view for tables that grow without bound (e.g. enquiries).
+
+    Sorting by a column in `keyset_sort` (each backed by an index ending in
+    id) pages with a cursor instead of OFFSET; the total is counted only up
+    to `count_cap` and shown as "10,000+"; the list queries run under a
+    `list_budget_ms` time budget so one slow filter can't tie up a worker.
+    """
+    list_template = "admin/large_list.html"
+    page_size = 50
+    can_set_page_size = False
+    count_cap = 10000
+    list_budget_ms = 2000
+    keyset_sort = ("created_at",)
+    column_default_sort = ("created_at", True)
+
+    def get_list(self, page, sort_column, sort_desc, search, filters,
+                 execute=True, page_size=None):
+        if not execute or page_size == 0:  # exports (unlimited page) keep the stock path
+            return super().get_list(page, sort_column, sort_desc, search, filters,
+                                    execute=execute, page_size=page_size)
+
+        page_size = page_size or self.page_size
+        query, joins = self.get_query(), {}
+        if self._search_supported and search:
+            query, _, joins, _ = self._apply_search(query, None, joins, {}, search)
+        if filters and self._filters:
+            query, _, joins, _ = self._apply_filters(query, None, joins, {}, filters)
+
+        if sort_column is None:
+            sort_column, sort_desc = self.column_default_sort
+
+        try:
+            with time_budget(self.session.connection(), self.list_budget_ms):
+                ids = query.with_entities(self.model.id).limit(self.count_cap + 1).subquery()
+                total = self.session.query(func.count()).select_from(ids).scalar()
+
+                if sort_column in self.keyset_sort:
+                    result = keyset_paginate(
+                        query, [getattr(self.model, sort_column), self.model.id],
+                        descending=bool(sort_desc), cursor=request.args.get("cursor", ""),
+                        per_page=page_size)
+                    rows = result.items
+                    self._template_args["keyset_pager"] = self._keyset_urls(result)
+                else:
+                    query, joins = self._apply_sorting(query, joins, sort_column, sort_desc)
+                    rows = self._apply_pagination(query, page, page_size).all()
+        except OperationalError:
+            self.session.rollback()
+            flash(gettext("The list took longer than %(s)s s to load. Narrow the filters and try again.",
+                          s=self.list_budget_ms / 1000), "error")
+            return None, []
+
+        self._template_args["count_label"] = (
+            f"{self.count_cap:,}+" if total > self.count_cap else f"{total:,}")
+        # None -> Flask-Admin's simple pager (no page count needed)
+        return None, rows
+
+    def _keyset_urls(self, result):
+        args = [(k, v) for k, v in request.args.items(multi=True) if k not in ("cursor", "page")]
+        first = f"{request.path}?{urlencode(args)}" if result.cursor else None
+        following = (f"{request.path}?{urlencode(args + [('cursor', result.next_cursor)])}"
+                     if result.next_cursor else None)
+        return {"first_url": first, "next_url": following}
+
+
+ENQUIRY_STATUSES = [("New", "New"), ("In Progress", "In Progress"), ("Closed", "Closed")]
+
+class EnquiryView(LargeTableModelView):
+    column_list = ("created_at", "status", "name", "email", "phone", "message")
+    column_sortable_list = ("created_at",)
+    column_filters = [FilterEqual(Enquiry.status, "Status", options=ENQUIRY_STATUSES)]
+    column_formatters = {
+        "message": lambda v, c, m, p: (m.message[:120] + "…") if len(m.message) > 120 else m.message,
+    }
+    column_formatters_export = {}  # full message text in exports
+    form_choices = {"status": ENQUIRY_STATUSES}
+
    
 class PageView(SecureModelView):
     form_columns = (
@@ -0,0 +1,137 @@
+"""
+Fingerprinted static assets.
+
+`flask build-assets` content-hashes every file under app/static into a
+manifest (css/site.css -> css/site.1a2b3c4d5e.css) and writes gzip/brotli
+siblings for text assets. At runtime:
+
+* url_for('static', filename=...) emits the hashed name,
+* hashed URLs are served from the original file with an immutable,
+  one-year Cache-Control,
+* a precompressed .br/.gz sibling is sent when the client accepts it,
+* uploads under media/ (already named by content hash) are immutable too.
+
+Without a manifest everything behaves exactly like stock Flask.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import Flask, current_app, request, send_from_directory
+
+try:  # optional: `pip install brotli` for .br siblings
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME = "assets-manifest.json"
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html", ".xml", ".map", ".ico")
+COMPRESSED_SUFFIXES = (".gz", ".br")
+ONE_YEAR = 365 * 24 * 3600
+# Content-addressed uploads (app/media.py): never fingerprinted, always immutable
+MEDIA_DIR = "media"
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()[:10]
+
+
+def _write_if_smaller(data: bytes, raw_size: int, path: str) -> bool:
+    if len(data) >= raw_size:
+        return False
+    with open(path, "wb") as fh:
+        fh.write(data)
+    return True
+
+
+def build_manifest(static_folder: str) -> dict:
+    """Hash every static file, write compressed siblings and the manifest."""
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder and MEDIA_DIR in dirs:
+            dirs.remove(MEDIA_DIR)   # uploads are already named by content hash
+        for name in files:
+            if name == MANIFEST_NAME or name.endswith(COMPRESSED_SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, static_folder).replace(os.sep, "/")
+            stem, ext = os.path.splitext(rel)
+            manifest[rel] = f"{stem}.{_file_hash(path)}{ext}"
+
+            if ext.lower() in COMPRESSIBLE:
+                with open(path, "rb") as fh:
+                    raw = fh.read()
+                _write_if_smaller(gzip.compress(raw, 9, mtime=0), len(raw), path + ".gz")
+                if brotli is not None:
+                    _write_if_smaller(brotli.compress(raw), len(raw), path + ".br")
+
+    with open(os.path.join(static_folder, MANIFEST_NAME), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    return manifest
+
+
+def _load_manifest(static_folder: str) -> dict:
+    path = os.path.join(static_folder, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _fresh_sibling(path: str, suffix: str) -> bool:
+    """True if `path + suffix` exists and is no older than `path` (so an
+    edited source isn't shadowed by a stale build-assets output)."""
+    try:
+        return os.path.getmtime(path + suffix) >= os.path.getmtime(path)
+    except OSError:
+        return False
+
+
+def serve_static(filename):
+    """Replacement for Flask's static view: hashed names + precompressed files."""
+    static_folder = current_app.static_folder
+    original = current_app.extensions["assets"]["reverse"].get(filename)
+    hashed = original is not None
+    filename = original or filename
+
+    media = filename.startswith(MEDIA_DIR + "/")
+    max_age = ONE_YEAR if hashed or media else None
+    mimetype = mimetypes.guess_type(filename)[0]
+
+    accepted = request.accept_encodings
+    for suffix, encoding in ((".br", "br"), (".gz", "gzip")):
+        if accepted[encoding] and _fresh_sibling(os.path.join(static_folder, filename), suffix):
+            resp = send_from_directory(static_folder, filename + suffix, mimetype=mimetype, max_age=max_age)
+            resp.headers["Content-Encoding"] = encoding
+            break
+    else:
+        resp = send_from_directory(static_folder, filename, max_age=max_age)
+
+    resp.vary.add("Accept-Encoding")
+    if hashed or media:
+        resp.cache_control.public = True
+        resp.cache_control.immutable = True
+    return resp
+
+
+def init_assets(app: Flask) -> None:
+    manifest = _load_manifest(app.static_folder) if app.config.get("ASSET_FINGERPRINTING", True) else {}
+    app.extensions["assets"] = {
+        "manifest": manifest,
+        "reverse": {v: k for k, v in manifest.items()},
+        # Changes whenever a rebuild changes any hashed URL (part of page ETags)
+        "version": hashlib.sha1(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()[:10],
+    }
+    app.view_functions["static"] = serve_static
+
+    if manifest:
+        @app.url_defaults
+        def _hashed_static_url(endpoint, values):
+            if endpoint == "static" and values.get("filename") in manifest:
+                values["filename"] = manifest[values["filename"]]
@@ -0,0 +1,281 @@
+"""
+Online SQLite backups and snapshot restore.
+
+`flask db-backup` (and "Back up now" in the admin) copies the live database
+with SQLite's backup API a few hundred pages at a time, pausing between
+steps, so readers and writers carry on while it runs; copying the file by
+hand can catch it mid-write. The copy is integrity-checked, gzipped and
+stored in BACKUP_DIR as
+
+    site-20260130-021500.db.gz
+    site-20260130-021500.db.gz.sha256     (`sha256sum -c` format)
+
+and only the newest BACKUP_KEEP snapshots are kept.
+
+`flask db-restore <snapshot>` checks the checksum and `PRAGMA
+integrity_check` on a decompressed copy before touching anything, snapshots
+the current database, then writes the restored pages into the live file
+through the backup API again (so running workers see a consistent database
+rather than a swapped file) and bumps every content version.
+
+Postgres has its own tools (pg_dump / PITR); these commands are SQLite-only.
+"""
+import gzip
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.request import pathname2url
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
+
+from . import content_versions
+from .extensions import db
+
+CHUNK = 1024 * 1024
+# A writer changing the source restarts the copy; after this many restarts
+# finish in one step (in WAL mode that still only holds a read snapshot)
+MAX_RESTARTS = 3
+
+_lock = threading.Lock()
+
+
+class BackupError(Exception):
+    pass
+
+
+def database_path() -> str:
+    url = db.engine.url
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        raise BackupError("db-backup/db-restore only handle file-based SQLite databases; use pg_dump for Postgres.")
+    return os.path.abspath(url.database)
+
+
+def backup_dir() -> str:
+    return current_app.config.get("BACKUP_DIR") or os.path.join(current_app.instance_path, "backups")
+
+
+def snapshots(directory=None) -> list:
+    """Snapshot paths in `directory`, newest first."""
+    directory = directory or backup_dir()
+    if not os.path.isdir(directory):
+        return []
+    names = [n for n in os.listdir(directory) if n.endswith(".db.gz")]
+    return [os.path.join(directory, n) for n in sorted(names, reverse=True)]
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _integrity(path: str) -> str:
+    conn = sqlite3.connect(_read_only(path), uri=True)
+    try:
+        rows = conn.execute("PRAGMA integrity_check").fetchall()
+    finally:
+        conn.close()
+    return "; ".join(r[0] for r in rows)
+
+
+def _copy(source: sqlite3.Connection, target: sqlite3.Connection, pages: int, pause: float) -> None:
+    """source.backup(target) in `pages`-page steps with a pause after each."""
+    state = {"remaining": None, "restarts": 0}
+
+    def progress(_status, remaining, _total):
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+        state["remaining"] = remaining
+        if state["restarts"] > MAX_RESTARTS:
+            raise _Restarted()
+        if pause:
+            time.sleep(pause)
+
+    try:
+        source.backup(target, pages=pages, progress=progress)
+    except _Restarted:
+        source.backup(target, pages=-1)
+
+
+class _Restarted(Exception):
+    pass
+
+
+class _exclusive:
+    """One backup/restore at a time: a thread lock plus an flock in the backup directory."""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, ".lock")
+
+    def __enter__(self):
+        if not _lock.acquire(blocking=False):
+            raise BackupError("Another backup or restore is already running.")
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(self.fd)
+                _lock.release()
+                raise BackupError("Another backup or restore is already running.") from None
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        _lock.release()
+
+
+def _read_only(path: str) -> str:
+    return "file:" + pathname2url(path) + "?mode=ro"
+
+
+def backup(directory=None, keep=None) -> dict:
+    """
+    Snapshot the live database into `directory` (default BACKUP_DIR) and keep
+    the newest `keep` snapshots (default BACKUP_KEEP; 0 keeps all).
+    Returns {"path", "sha256", "size", "db_size", "seconds", "removed"}.
+    """
+    directory = directory or backup_dir()
+    keep = current_app.config.get("BACKUP_KEEP", 14) if keep is None else keep
+    os.makedirs(directory, exist_ok=True)
+    with _exclusive(directory):
+        return _snapshot(directory, keep)
+
+
+def _snapshot(directory, keep, label=None) -> dict:
+    cfg = current_app.config
+    source_path = database_path()
+    t0 = time.perf_counter()
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"{os.path.splitext(os.path.basename(source_path))[0]}-{stamp}{'-' + label if label else ''}.db"
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".backup-", suffix=".db")
+    os.close(fd)
+    gz_tmp = tmp + ".gz"
+    try:
+        source = sqlite3.connect(_read_only(source_path), uri=True,
+                                 timeout=cfg.get("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000)
+        target = sqlite3.connect(tmp)
+        try:
+            _copy(source, target, cfg.get("BACKUP_STEP_PAGES", 256), cfg.get("BACKUP_STEP_PAUSE_MS", 5) / 1000)
+            # A self-contained file: no -wal side file to lose
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            target.close()
+            source.close()
+
+        check = _integrity(tmp)
+        if check != "ok":
+            raise BackupError(f"Backup copy failed integrity_check: {check}")
+
+        with open(tmp, "rb") as raw, gzip.open(gz_tmp, "wb", compresslevel=6) as out:
+            shutil.copyfileobj(raw, out, CHUNK)
+        db_size = os.path.getsize(tmp)
+        checksum = _sha256(gz_tmp)
+
+        path = os.path.join(directory, name + ".gz")
+        os.replace(gz_tmp, path)
+        with open(path + ".sha256", "w", encoding="utf-8") as fh:
+            fh.write(f"{checksum}  {os.path.basename(path)}\n")
+    finally:
+        for leftover in (tmp, gz_tmp):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    removed = []
+    for old in snapshots(directory)[keep:] if keep else []:
+        for p in (old, old + ".sha256"):
+            if os.path.exists(p):
+                os.remove(p)
+        removed.append(old)
+
+    return {"path": path, "sha256": checksum, "size": os.path.getsize(path), "db_size": db_size,
+            "seconds": round(time.perf_counter() - t0, 2), "removed": removed}
+
+
+def verify(snapshot: str) -> str:
+    """Check `snapshot` against its .sha256 file; returns the digest."""
+    sidecar = snapshot + ".sha256"
+    if not os.path.exists(sidecar):
+        raise BackupError(f"{sidecar} not found; refusing to restore an unverified snapshot.")
+    with open(sidecar, encoding="utf-8") as fh:
+        expected = fh.read().split()[0]
+    actual = _sha256(snapshot)
+    if actual != expected:
+        raise BackupError(f"Checksum mismatch for {snapshot}: expected {expected}, got {actual}.")
+    return actual
+
+
+def restore(snapshot: str, safety_backup: bool = True) -> dict:
+    """
+    Verify `snapshot`, then replace the live database's contents with it.
+    Unless `safety_backup` is off, the current database is snapshotted first.
+    """
+    target_path = database_path()
+    verify(snapshot)
+    directory = backup_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target_path), prefix=".restore-", suffix=".db")
+    os.close(fd)
+    try:
+        with _exclusive(directory):
+            previous = _restore(snapshot, tmp, target_path, directory, safety_backup)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    # Every cache in every worker was built from the old data
+    reg = content_versions.registry()
+    if reg is not None:
+        reg.bump(db.metadata.tables)
+    return {"restored": snapshot, "previous": previous}
+
+
+def _restore(snapshot, tmp, target_path, directory, safety_backup):
+    with gzip.open(snapshot, "rb") as src, open(tmp, "wb") as out:
+        shutil.copyfileobj(src, out, CHUNK)
+    check = _integrity(tmp)
+    if check != "ok":
+        raise BackupError(f"Snapshot failed integrity_check: {check}")
+
+    previous = _snapshot(directory, 0, label="pre-restore")["path"] if safety_backup else None
+
+    db.session.remove()
+    db.engine.dispose()
+    source = sqlite3.connect(tmp)
+    target = sqlite3.connect(target_path, timeout=current_app.config.get("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return previous
+
+
+def backup_in_background(app) -> threading.Thread:
+    """Run `backup` off the request thread (admin "Back up now")."""
+    def run():
+        with app.app_context():
+            try:
+                result = backup()
+                app.logger.info("Backup written: %s (%s bytes, %.1fs)",
+                                result["path"], result["size"], result["seconds"])
+            except Exception:
+                app.logger.exception("Backup failed")
+
+    t = threading.Thread(target=run, name="db-backup", daemon=True)
+    t.start()
+    return t
@@ -3,6 +3,7 @@ from flask_login import login_user, logout_user, login_required
 from urllib.parse import urlparse
 from ...models import User
 from ...extensions import db
+from ...identity import LoginBusy, verify_password
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -18,7 +19,12 @@ def login_post():
     next_url = request.form.get("next", "")
 
     user = User.query.filter_by(email=email).first()
-    if not user or not user.check_password(password) or not user.is_admin:
+    try:
+        valid = bool(user) and user.is_admin and verify_password(user, password)
+    except LoginBusy:
+        flash("Too many sign-ins right now. Please try again in a moment.", "warning")
+        return redirect(url_for("auth.login", next=next_url))
+    if not valid:
         flash("Invalid credentials.", "danger")
         return redirect(url_for("auth.login", next=next_url))
 
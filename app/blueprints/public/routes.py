@@ -1,9 +1,19 @@
-from flask import Blueprint, render_template, abort, request, redirect, url_for, flash
-from sqlalchemy import desc
+from flask import Blueprint, render_template, abort, request, redirect, url_for, flash, current_app
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
 from ...extensions import db
 from flask import url_for
+from ...site_cache import get_chrome
+from ...response_cache import cached_page
+from ...home_snapshot import get_home_snapshot
+from ...pagination import keyset_paginate, requested_page_size
+from ... import search as site_search
+from ...read_models import (
+    NEWS_CARD, EVENT_ROW, FACULTY_CARD, ALUMNI_CARD, PROJECT_CARD, NEWSLETTER_CARD,
+    PROGRAM_CARD, STAT_ROW, MOU_ROW, ALBUM_CARD,
+)
 from ...models import (
-    SiteSettings, Page, Program, Faculty, News, Event, Achievement,
+    Page, Program, Faculty, News, Event, Achievement,
     FundedProject, MoU, PlacementStat, Newsletter, Enquiry,
     GalleryAlbum, GalleryImage,Alumni,HeroSlide
 )
@@ -11,63 +21,42 @@ from ...models import (
 public_bp = Blueprint("public", __name__)
 
 def get_settings():
-    s = SiteSettings.query.first()
-    if not s:
-        s = SiteSettings()
-        db.session.add(s)
-        db.session.commit()
-    return s
+    # Immutable snapshot, rebuilt only when the CMS saves SiteSettings/Page
+    return get_chrome().settings
+
+@public_bp.context_processor
+def inject_menu_pages():
+    return {"menu_pages": get_chrome().menu_pages}
 
 @public_bp.get("/")
+@cached_page(HeroSlide, Page, Program, News, Event, Achievement, MoU, PlacementStat)
 def home():
-    settings = get_settings()  
-
-    slides = (HeroSlide.query
-              .filter_by(is_active=True)
-              .order_by(HeroSlide.order.asc(), HeroSlide.created_at.desc())
-              .all())
-
-    about_page = Page.query.filter_by(slug="about", is_published=True).first()
-
-    programs_ug = Program.query.filter_by(level="UG", is_published=True).all()
-    programs_pg = Program.query.filter_by(level="PG", is_published=True).all()
-    programs_res = Program.query.filter_by(level="Research", is_published=True).all()
-
-    news = News.query.filter_by(is_published=True).order_by(desc(News.published_on)).limit(4).all()
-    events = Event.query.filter_by(is_published=True).order_by(Event.starts_at.asc()).limit(4).all()
-    achievements = Achievement.query.filter_by(is_published=True).order_by(desc(Achievement.is_featured), desc(Achievement.created_at)).limit(6).all()
-    mous = MoU.query.filter_by(is_published=True).limit(8).all()
-    placement_stats = PlacementStat.query.filter_by(is_visible=True).limit(6).all()
-   # alumni = Alumni.query.order_by(Alumni.is_featured.desc(), Alumni.created_at.desc()).limit(6).all()
+    settings = get_settings()
+    home = get_home_snapshot()
+    programs = home["programs"]
 
     return render_template("public/home.html",
                            settings=settings,
-                           slides=slides,
-                           about_page = about_page, 
-                           programs_ug=programs_ug,
-                           programs_pg=programs_pg,
-                           programs_res=programs_res,
-                           news=news,
-                           events=events,
-                           achievements=achievements,
-                           mous=mous,
-                           placement_stats=placement_stats,
-                           #alumni=alumni)
+                           slides=home["slides"],
+                           about_page=home["about_page"],
+                           programs_ug=programs.get("UG", ()),
+                           programs_pg=programs.get("PG", ()),
+                           programs_res=programs.get("Research", ()),
+                           news=home["news"],
+                           events=home["events"],
+                           achievements=home["achievements"],
+                           mous=home["mous"],
+                           placement_stats=home["placement_stats"],
                          )
 
 @public_bp.get("/p/<slug>")
+@cached_page(Page)
 def page_by_slug(slug):
     settings = get_settings()
     page = Page.query.filter_by(slug=slug, is_published=True).first_or_404()
 
-    # normalize banner URL
-    if page.header_image_url:
-        if page.header_image_url.startswith("/static/") or page.header_image_url.startswith("http"):
-            header_image = page.header_image_url
-        else:
-            header_image = url_for("static", filename=page.header_image_url)
-    else:
-        header_image = url_for("static", filename="images/headers/default.jpg")
+    # header_image_url is stored normalised ("/static/...") by app/rich_text.py
+    header_image = page.header_image_url or url_for("static", filename="images/headers/default.jpg")
 
     return render_template(
         "public/page.html",
@@ -80,18 +69,12 @@ def page_by_slug(slug):
 
 
 @public_bp.get("/about")
+@cached_page(Page)
 def about():
     settings = get_settings()
     page = Page.query.filter_by(slug="about", is_published=True).first()
 
-    # ✅ normalize banner URL
-    if page and page.header_image_url:
-        if page.header_image_url.startswith("/static/") or page.header_image_url.startswith("http"):
-            header_image = page.header_image_url
-        else:
-            header_image = url_for("static", filename=page.header_image_url)
-    else:
-        header_image = url_for("static", filename="images/headers/about.jpg")
+    header_image = (page and page.header_image_url) or url_for("static", filename="images/headers/about.jpg")
 
     return render_template(
         "public/page.html",
@@ -103,19 +86,19 @@ def about():
         header_subtitle=(page.header_subtitle if page and page.header_subtitle else "Aim, scope, vision, and facilities"),
     )
 @public_bp.get("/academics")
+@cached_page(Program)
 def academics():
     settings = get_settings()
-    programs = Program.query.filter_by(is_published=True).all()
+    programs = PROGRAM_CARD.all(PROGRAM_CARD.query().filter(Program.is_published.is_(True)))
     return render_template("public/academics.html", settings=settings, programs=programs)
 
 @public_bp.get("/faculty")
+@cached_page(Faculty)
 def faculty():
     settings = get_settings()
-    faculty_list = (Faculty.query
-              .filter_by(is_published=True)
-              .order_by(Faculty.display_order.asc())
-              .all()
-                )
+    faculty_list = FACULTY_CARD.all(FACULTY_CARD.query()
+                                    .filter(Faculty.is_published.is_(True))
+                                    .order_by(Faculty.display_order.asc()))
     return render_template("public/faculty.html", 
                            settings=settings, 
                            faculty_list=faculty_list,
@@ -125,31 +108,40 @@ def faculty():
                            )
 
 @public_bp.get("/research")
+@cached_page(FundedProject)
 def research():
     settings = get_settings()
-    projects = FundedProject.query.filter_by(is_published=True).order_by(FundedProject.created_at.desc()).all()
-    return render_template("public/research.html", settings=settings, projects=projects)
+    pager = keyset_paginate(PROJECT_CARD.query().filter(FundedProject.is_published.is_(True)),
+                            [FundedProject.created_at, FundedProject.id], descending=True,
+                            row_factory=PROJECT_CARD.row._make)
+    return render_template("public/research.html", settings=settings, projects=pager.items, pager=pager)
 
 @public_bp.get("/placements")
+@cached_page(PlacementStat, MoU)
 def placements():
     settings = get_settings()
-    stats = PlacementStat.query.filter_by(is_visible=True).all()
-    mous = MoU.query.filter_by(is_published=True).all()
+    stats = STAT_ROW.all(STAT_ROW.query().filter(PlacementStat.is_visible.is_(True)))
+    mous = MOU_ROW.all(MOU_ROW.query().filter(MoU.is_published.is_(True)))
     return render_template("public/placements.html", settings=settings, stats=stats, mous=mous)
 
 @public_bp.get("/news")
+@cached_page(News)
 def news_list():
     settings = get_settings()
-    items = News.query.filter_by(is_published=True).order_by(desc(News.published_on)).all()
+    pager = keyset_paginate(NEWS_CARD.query().filter(News.is_published.is_(True)),
+                            [News.published_on, News.id], descending=True,
+                            row_factory=NEWS_CARD.row._make)
     return render_template("public/news_list.html", 
                            settings=settings, 
-                           items=items,
+                           items=pager.items,
+                           pager=pager,
                            header_image=settings.banner_news,
                            header_title="News & Updates",
                            header_subtitle="Latest announcements and achievements"
                            )
 
 @public_bp.get("/news/<slug>")
+@cached_page(News)
 def news_detail(slug: str):
     settings = get_settings()
     item = News.query.filter_by(slug=slug, is_published=True).first()
@@ -158,22 +150,28 @@ def news_detail(slug: str):
     return render_template("public/news_detail.html", settings=settings, item=item,)
 
 @public_bp.get("/events")
+@cached_page(Event)
 def events_list():
     settings = get_settings()
-    items = Event.query.filter_by(is_published=True).order_by(Event.starts_at.asc()).all()
+    pager = keyset_paginate(EVENT_ROW.query().filter(Event.is_published.is_(True)),
+                            [Event.starts_at, Event.id], row_factory=EVENT_ROW.row._make)
     return render_template("public/events_list.html", 
                            settings=settings, 
-                           items=items,
+                           items=pager.items,
+                           pager=pager,
                             header_image=settings.banner_events,
                             header_title="Events",
                             header_subtitle="Academic and campus events"
                            )
 
 @public_bp.get("/newsletter")
+@cached_page(Newsletter)
 def newsletter():
     settings = get_settings()
-    items = Newsletter.query.filter_by(is_published=True).order_by(Newsletter.published_on.desc()).all()
-    return render_template("public/newsletter.html", settings=settings, items=items)
+    pager = keyset_paginate(NEWSLETTER_CARD.query().filter(Newsletter.is_published.is_(True)),
+                            [Newsletter.published_on, Newsletter.id], descending=True,
+                            row_factory=NEWSLETTER_CARD.row._make)
+    return render_template("public/newsletter.html", settings=settings, items=pager.items, pager=pager)
 
 @public_bp.get("/contact")
 def contact():
@@ -197,30 +195,86 @@ def contact_post():
     return redirect(url_for("public.contact"))
 
 @public_bp.get("/gallery")
+@cached_page(GalleryAlbum, GalleryImage)
 def gallery():
     settings = get_settings()
-    albums = GalleryAlbum.query.filter_by(is_published=True).order_by(GalleryAlbum.year.desc()).all()
+
+    # Photo count and first photo per album in one aggregate (no per-album lazy load)
+    stats = (db.session.query(GalleryImage.album_id.label("album_id"),
+                              func.count(GalleryImage.id).label("image_count"),
+                              func.min(GalleryImage.id).label("first_image_id"))
+             .group_by(GalleryImage.album_id)
+             .subquery())
+    first_image = aliased(GalleryImage)
+
+    albums = (db.session.query(
+                  GalleryAlbum.id, GalleryAlbum.title, GalleryAlbum.category, GalleryAlbum.year,
+                  func.coalesce(func.nullif(GalleryAlbum.cover_image_url, ""),
+                                first_image.image_url).label("cover_image_url"),
+                  func.coalesce(stats.c.image_count, 0).label("image_count"))
+              .outerjoin(stats, stats.c.album_id == GalleryAlbum.id)
+              .outerjoin(first_image, first_image.id == stats.c.first_image_id)
+              .filter(GalleryAlbum.is_published.is_(True)))
+
+    pager = keyset_paginate(albums, [GalleryAlbum.year, GalleryAlbum.id], descending=True,
+                            row_factory=ALBUM_CARD._make)
     return render_template(
         "public/gallery.html",
         settings=settings,
-        albums=albums,
+        albums=pager.items,
+        pager=pager,
         header_title="Gallery",
         header_subtitle="Events, Workshops, Alumni Meets"
     )
 @public_bp.get("/gallery/<int:album_id>")
+@cached_page(GalleryAlbum, GalleryImage)
 def gallery_album(album_id):
     settings = get_settings()
     album = GalleryAlbum.query.filter_by(id=album_id, is_published=True).first_or_404()
-    return render_template("public/gallery_album.html", settings=settings, album=album)
+
+    # Photos are fetched in bulk, one page at a time (large event albums)
+    pager = keyset_paginate(
+        GalleryImage.query.filter_by(album_id=album.id),
+        [GalleryImage.id],
+        per_page=requested_page_size(current_app.config.get("GALLERY_PAGE_SIZE", 60),
+                                     current_app.config.get("GALLERY_PAGE_SIZE_MAX", 240)),
+    )
+    return render_template("public/gallery_album.html", settings=settings, album=album,
+                           images=pager.items, pager=pager)
+
+@public_bp.get("/search")
+@cached_page(Page, News, Event, Faculty, FundedProject)
+def search():
+    settings = get_settings()
+    q = request.args.get("q", "").strip()[:200]
+    page_no = max(1, min(request.args.get("page", 1, type=int), 50))
+    per_page = requested_page_size(10, 50)
+
+    hits = site_search.search(q, limit=per_page + 1, offset=(page_no - 1) * per_page) if q else []
+    return render_template(
+        "public/search.html",
+        settings=settings,
+        q=q,
+        hits=hits[:per_page],
+        page_no=page_no,
+        has_next=len(hits) > per_page,
+        kind_labels=site_search.KIND_LABELS,
+        header_title="Search",
+        header_subtitle=(f"Results for “{q}”" if q else "Pages, news, events, faculty and projects"),
+    )
 
 @public_bp.get("/alumni")
+@cached_page(Alumni)
 def alumni():
     settings = get_settings()
-    alumni_list = Alumni.query.order_by(Alumni.graduation_year.desc()).all()
+    pager = keyset_paginate(ALUMNI_CARD.query(),
+                            [Alumni.graduation_year, Alumni.id], descending=True,
+                            row_factory=ALUMNI_CARD.row._make)
     return render_template(
         "public/alumni.html",
         settings=settings,
-        alumni=alumni_list,
+        alumni=pager.items,
+        pager=pager,
         header_title="Alumni",
         header_subtitle="Our Graduates, Our Pride"
     )
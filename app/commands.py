@@ -0,0 +1,270 @@
+import os
+
+import click
+from flask import Flask
+
+from .extensions import db
+
+
+def register_commands(app: Flask) -> None:
+
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create tables, apply migrations, build the search index, seed settings/admin."""
+        from .provision import provision
+
+        result = provision(app)
+        click.echo("Applied: " + ", ".join(result["migrations"]) if result["migrations"]
+                   else "Schema is up to date.")
+        if result["search_indexed"] is not None:
+            click.echo(f"Indexed {result['search_indexed']} records for search.")
+        if result["created_settings"]:
+            click.echo("Created the site settings row.")
+        if result["seeded_admin"]:
+            click.echo(f"Created admin {result['seeded_admin']} (from ADMIN_EMAIL / ADMIN_PASSWORD).")
+
+    @app.cli.command("create-admin")
+    @click.argument("email")
+    @click.password_option()
+    def create_admin_command(email, password):
+        """Create an admin account, or reset an existing user's password and make them admin."""
+        from .provision import create_admin
+
+        created = create_admin(email, password)
+        click.echo(f"{'Created' if created else 'Updated'} admin {email.strip().lower()}.")
+
+    @app.cli.command("generate-variants")
+    @click.option("--force", is_flag=True, help="Regenerate even if variants are up to date.")
+    def generate_variants_command(force):
+        """Backfill responsive image variants for every image already in the CMS."""
+        from .images import IMAGE_FIELDS, ensure_variants, generate_variants
+        from .rich_text import RENDERED, image_sources, render_all
+
+        seen = set()
+        embedded = False
+
+        def check(url):
+            if not url or url in seen:
+                return False
+            seen.add(url)
+            made = generate_variants(url) if force else ensure_variants(url)
+            if made:
+                click.echo(f"variants: {url}")
+            return bool(made)
+
+        for model, fields in IMAGE_FIELDS.items():
+            for row in model.query.all():
+                for field in fields:
+                    check(getattr(row, field, None))
+        for model, pairs in RENDERED.items():
+            for row in model.query.all():
+                for source in pairs:
+                    for url in image_sources(getattr(row, source)):
+                        embedded = check(url) or embedded
+        db.session.flush()
+        if embedded:
+            render_all()   # point rich text at the new variants
+        db.session.commit()
+        click.echo(f"Checked {len(seen)} images.")
+
+    @app.cli.command("render-content")
+    def render_content_command():
+        """Re-render every rich-text column (sanitised HTML, lazy images, variants)."""
+        from .rich_text import render_all
+
+        n = render_all()
+        db.session.commit()
+        click.echo(f"Rendered {n} row(s).")
+
+    @app.cli.command("ingest-gallery")
+    @click.argument("album_id", type=int)
+    @click.argument("source", type=click.Path(exists=True))
+    @click.option("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    @click.option("--captions", is_flag=True, help="Use file names as captions.")
+    def ingest_gallery_command(album_id, source, workers, captions):
+        """Add every photo in a folder or .zip to a gallery album."""
+        from .gallery_ingest import ingest
+
+        result = ingest(album_id, source, workers=workers, with_captions=captions)
+        click.echo(f"Added {result['added']} photo(s) to album {album_id}.")
+        for name, error in result["failed"]:
+            click.echo(f"  skipped {name}: {error}", err=True)
+
+    @app.cli.command("build-assets")
+    def build_assets_command():
+        """Fingerprint static files and write .gz/.br siblings (restart to pick up)."""
+        from .assets import build_manifest, brotli
+
+        manifest = build_manifest(app.static_folder)
+        click.echo(f"Fingerprinted {len(manifest)} files"
+                   + ("" if brotli else " (install 'brotli' for .br files)") + ".")
+
+    @app.cli.command("search-reindex")
+    def search_reindex_command():
+        """Rebuild the full-text search index from scratch."""
+        from .search import ensure_search_schema, reindex_all
+
+        ensure_search_schema()
+        click.echo(f"Indexed {reindex_all()} records.")
+
+    @app.cli.command("export-static")
+    @click.option("--out", "out_dir", type=click.Path(file_okay=False), default=None,
+                  help="Output directory (default: instance/static-export).")
+    @click.option("--full", is_flag=True, help="Re-render every page, not only changed ones.")
+    @click.option("--jobs", type=int, default=os.cpu_count() or 1, show_default=True,
+                  help="Render processes.")
+    @click.option("--with-static", is_flag=True, help="Also copy app/static into <out>/static.")
+    def export_static_command(out_dir, full, jobs, with_static):
+        """Pre-render the public site to HTML files for Nginx."""
+        from .static_export import export_site
+
+        out_dir = out_dir or os.path.join(app.instance_path, "static-export")
+        result = export_site(out_dir, full=full, jobs=jobs, with_static=with_static)
+        click.echo(f"Rendered {result['rendered']}, unchanged {result['skipped']}, "
+                   f"removed {result['removed']} -> {out_dir}")
+        for url, status in result["failed"]:
+            click.echo(f"  {url}: HTTP {status}", err=True)
+
+    @app.cli.command("db-profile")
+    def db_profile_command():
+        """Show the active database engine settings."""
+        from .db_profiles import describe
+
+        for key, value in describe(db).items():
+            click.echo(f"{key:>18}: {value}")
+
+    @app.cli.command("db-upgrade")
+    def db_upgrade_command():
+        """Apply pending schema migrations (indexes/columns)."""
+        from .migrations import upgrade
+
+        ran = upgrade()
+        click.echo("Applied: " + ", ".join(ran) if ran else "Database is up to date.")
+
+    @app.cli.command("db-explain")
+    @click.argument("urls", nargs=-1)
+    @click.option("--scans-only", is_flag=True, help="Only show plans with a full table scan or temp B-tree.")
+    def db_explain_command(urls, scans_only):
+        """Print query plans for every public route (or the given URLs)."""
+        from .query_plans import plan_report
+
+        for url, statement, plan in plan_report(list(urls) or None):
+            flagged = any(("SCAN" in line and "USING" not in line) or "TEMP B-TREE" in line
+                          or "Seq Scan" in line for line in plan)
+            if scans_only and not flagged:
+                continue
+            click.echo(f"\n== {url}{'  [!]' if flagged else ''}")
+            click.echo("   " + " ".join(statement.split()))
+            for line in plan:
+                click.echo(f"   -> {line}")
+
+    from .content_import import IMPORTABLE
+
+    @app.cli.command("import-content")
+    @click.argument("kind", type=click.Choice(sorted(IMPORTABLE)))
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--batch-size", type=int, default=2000, show_default=True)
+    @click.option("--dry-run", is_flag=True, help="Validate only; write nothing.")
+    @click.option("--strict", is_flag=True, help="Abort on the first invalid row.")
+    def import_content_command(kind, path, batch_size, dry_run, strict):
+        """Bulk-load content from CSV, JSON Lines or a JSON array (.gz ok)."""
+        from .content_import import ContentImportError, import_content
+
+        try:
+            result = import_content(kind, path, batch_size=batch_size, dry_run=dry_run, strict=strict)
+        except ContentImportError as exc:
+            raise click.ClickException(str(exc))
+        verb = "Valid" if dry_run else "Imported"
+        click.echo(f"{verb}: {result['written']} row(s), skipped {result['skipped']}.")
+        for where, error in result["errors"]:
+            click.echo(f"  row {where}: {error}", err=True)
+
+    from .exports import EXPORTABLE
+
+    @app.cli.command("export-content")
+    @click.argument("kind", type=click.Choice(sorted(EXPORTABLE)))
+    @click.option("--out", "out_path", type=click.Path(dir_okay=False), default=None,
+                  help="Output file (default: stdout).")
+    @click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default="csv", show_default=True)
+    @click.option("--gzip", "compress", is_flag=True, help="Gzip the output.")
+    @click.option("--since", type=click.DateTime(), default=None, help="Only rows created on/after this date.")
+    def export_content_command(kind, out_path, fmt, compress, since):
+        """Stream a table to CSV/JSON Lines (re-importable with import-content)."""
+        import sys
+        from .exports import export_model
+
+        if out_path:
+            with open(out_path, "wb") as out:
+                n = export_model(kind, out, fmt=fmt, compress=compress, since=since)
+            click.echo(f"Exported {n} row(s) -> {out_path}", err=True)
+        else:
+            n = export_model(kind, sys.stdout.buffer, fmt=fmt, compress=compress, since=since)
+            click.echo(f"Exported {n} row(s).", err=True)
+
+    @app.cli.command("content-versions")
+    @click.option("--bump", is_flag=True, help="Bump every table, e.g. after editing the database by hand.")
+    def content_versions_command(bump):
+        """Show the shared per-table content versions the worker caches check."""
+        import time
+        from .content_versions import registry
+
+        reg = registry()
+        if reg is None:
+            raise click.ClickException("CONTENT_VERSIONS_ENABLED is off.")
+        if bump:
+            reg.bump(db.metadata.tables)
+        tables = sorted(db.metadata.tables)
+        click.echo(f"{reg.path} (epoch {reg.epoch})")
+        for table, (version, changed_at) in zip(tables, reg.read(tables)):
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(changed_at)) if changed_at else "-"
+            click.echo(f"  {table:<24}{version:>8}  {when}")
+
+    @app.cli.command("media-gc")
+    @click.option("--dry-run", is_flag=True, help="Only list what would be deleted.")
+    @click.option("--grace-hours", type=float, default=None,
+                  help="Keep unreferenced blobs this long (default: MEDIA_GC_GRACE_HOURS).")
+    def media_gc_command(dry_run, grace_hours):
+        """Recount media references and delete uploads nothing points at any more."""
+        from .media import collect_garbage
+
+        result = collect_garbage(grace_hours=grace_hours, dry_run=dry_run)
+        for url in result["deleted"]:
+            click.echo(f"{'would delete' if dry_run else 'deleted'}: {url}")
+        for url in result["missing"]:
+            click.echo(f"missing file: {url}", err=True)
+        click.echo(f"{result['blobs']} blob(s) indexed, {len(result['deleted'])} "
+                   f"{'to delete' if dry_run else 'deleted'} ({result['bytes'] / 1024:.0f} KiB).")
+
+    @app.cli.command("db-backup")
+    @click.option("--dir", "directory", type=click.Path(file_okay=False), default=None,
+                  help="Where to write the snapshot (default: BACKUP_DIR or instance/backups).")
+    @click.option("--keep", type=int, default=None, help="Snapshots to keep (default: BACKUP_KEEP; 0 = all).")
+    def db_backup_command(directory, keep):
+        """Snapshot the live SQLite database (online, gzipped, checksummed)."""
+        from .backups import BackupError, backup
+
+        try:
+            result = backup(directory=directory, keep=keep)
+        except BackupError as exc:
+            raise click.ClickException(str(exc))
+        click.echo(f"{result['path']}  {result['db_size'] / 1024:.0f} KiB -> {result['size'] / 1024:.0f} KiB "
+                   f"in {result['seconds']}s")
+        click.echo(f"sha256 {result['sha256']}")
+        for old in result["removed"]:
+            click.echo(f"removed {old}")
+
+    @app.cli.command("db-restore")
+    @click.argument("snapshot", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--no-safety-backup", is_flag=True, help="Don't snapshot the current database first.")
+    @click.confirmation_option(prompt="Replace the current database with this snapshot?")
+    def db_restore_command(snapshot, no_safety_backup):
+        """Verify a db-backup snapshot and restore it into the live database."""
+        from .backups import BackupError, restore
+
+        try:
+            result = restore(snapshot, safety_backup=not no_safety_backup)
+        except BackupError as exc:
+            raise click.ClickException(str(exc))
+        if result["previous"]:
+            click.echo(f"Previous database saved as {result['previous']}")
+        click.echo(f"Restored {result['restored']}")
@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from .db_profiles import engine_options
 
 load_dotenv()
 
@@ -21,6 +22,73 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Create tables / run migrations / seed the first admin inside create_app().
+    # Off for servers (run `flask init-db` once per deploy); run.py turns it on for dev.
+    AUTO_PROVISION = os.getenv("AUTO_PROVISION", "0") == "1"
+
+    # Engine tuning per backend (WAL/pragmas for SQLite, pool for Postgres)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLITE_READ_ONLY_GETS = os.getenv("SQLITE_READ_ONLY_GETS", "1") == "1"
+
+    # Versioned response cache for public pages (ETag / 304)
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+
+    # Per-table versions shared by all workers through an mmap'd file in instance/
+    # (see app/content_versions.py); off = caches only hear about this process's writes
+    CONTENT_VERSIONS_ENABLED = os.getenv("CONTENT_VERSIONS_ENABLED", "1") == "1"
+    CONTENT_VERSIONS_PATH = os.getenv("CONTENT_VERSIONS_PATH")  # default: instance/content-versions-<db hash>.bin
+
+    # {% cache %} fragments in public templates and compiled templates in instance/jinja-bytecode/
+    FRAGMENT_CACHE_ENABLED = os.getenv("FRAGMENT_CACHE_ENABLED", "1") == "1"
+    FRAGMENT_CACHE_MAX_BYTES = int(os.getenv("FRAGMENT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+    TEMPLATE_BYTECODE_CACHE = os.getenv("TEMPLATE_BYTECODE_CACHE", "1") == "1"
+
+    # Hosts allowed in <iframe src> inside CMS rich text (everything else is stripped on save)
+    RICH_TEXT_IFRAME_HOSTS = tuple(h.strip() for h in os.getenv(
+        "RICH_TEXT_IFRAME_HOSTS", "www.youtube.com,www.youtube-nocookie.com,player.vimeo.com,www.google.com"
+    ).split(",") if h.strip())
+
+    # Content-addressed uploads (app/media.py): backend name from media.BACKENDS, and how long
+    # an unreferenced blob is kept before `flask media-gc` deletes it
+    MEDIA_STORE = os.getenv("MEDIA_STORE", "local")
+    MEDIA_GC_GRACE_HOURS = float(os.getenv("MEDIA_GC_GRACE_HOURS", "24"))
+
+    # Online SQLite snapshots (app/backups.py): instance/backups/ by default, newest BACKUP_KEEP kept;
+    # the copy runs BACKUP_STEP_PAGES pages at a time with a short pause so requests never wait on it
+    BACKUP_DIR = os.getenv("BACKUP_DIR")
+    BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "14"))
+    BACKUP_STEP_PAGES = int(os.getenv("BACKUP_STEP_PAGES", "256"))
+    BACKUP_STEP_PAUSE_MS = int(os.getenv("BACKUP_STEP_PAUSE_MS", "5"))
+
+    # Keyset pagination on public list pages (?per_page= is capped)
+    PUBLIC_PAGE_SIZE = int(os.getenv("PUBLIC_PAGE_SIZE", "12"))
+    PUBLIC_PAGE_SIZE_MAX = int(os.getenv("PUBLIC_PAGE_SIZE_MAX", "48"))
+    GALLERY_PAGE_SIZE = int(os.getenv("GALLERY_PAGE_SIZE", "60"))
+    GALLERY_PAGE_SIZE_MAX = int(os.getenv("GALLERY_PAGE_SIZE_MAX", "240"))
+
+    # Responsive image variants written when images are saved in the CMS
+    IMAGE_VARIANT_WIDTHS = tuple(int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "480,960,1600").split(","))
+    IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "webp")  # webp | avif (if Pillow supports it)
+    # Source URLs whose variant list each worker keeps in memory (LRU)
+    IMAGE_VARIANT_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_VARIANT_CACHE_MAX_ENTRIES", "2048"))
+
+    # Bulk gallery upload (process pool size; empty = CPU count)
+    GALLERY_INGEST_WORKERS = int(os.getenv("GALLERY_INGEST_WORKERS", "0")) or None
+
+    # Hashed static URLs from `flask build-assets` (app/static/assets-manifest.json)
+    ASSET_FINGERPRINTING = os.getenv("ASSET_FINGERPRINTING", "1") == "1"
+
+    # Server-Timing header, admin Performance view and /metrics
+    INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "1") == "1"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # unset: /metrics is disabled (404)
+
+    # Logged-in identity cache and password hashing (see app/identity.py)
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", "60"))  # seconds; 0 = no cache
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")  # e.g. scrypt:16384:8:1, pbkdf2:sha256:600000
+    LOGIN_HASH_CONCURRENCY = int(os.getenv("LOGIN_HASH_CONCURRENCY", "2"))
+    LOGIN_HASH_WAIT = float(os.getenv("LOGIN_HASH_WAIT", "5"))
+
     # Seed admin (dev / review only)
     ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@saveetha.edu.in")
     ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "ChangeMe@123")
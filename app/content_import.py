@@ -0,0 +1,403 @@
+"""
+Bulk content import from CSV / JSON Lines / JSON arrays (optionally .gz).
+
+Files are streamed row by row and written in batches, so memory stays flat
+however large the export is:
+
+- SQLite:   executemany of INSERT ... ON CONFLICT (key) DO UPDATE
+- Postgres: COPY into a temp table per batch, then INSERT ... SELECT ...
+            ON CONFLICT (key) DO UPDATE
+
+Rows are checked against the model's columns (unknown columns, required
+values, types, string lengths). Models with a unique natural key are upserted
+on it (News.slug, Page.slug); the others are upserted on `id` when the file
+carries one and appended otherwise.
+
+Core inserts bypass ORM events, so rendered rich-text columns are computed
+here (app/rich_text.py; any rendered values in the file are ignored), the
+search index for the imported model is rebuilt and `content_changed` is sent
+afterwards.
+"""
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+from itertools import chain
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, String, insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .rich_text import derived_columns, process_values, variant_lookup
+from .models import (
+    Achievement, Alumni, Event, Faculty, FundedProject, GalleryAlbum, GalleryImage, HeroSlide,
+    MoU, News, Newsletter, Page, PlacementStat, Program,
+)
+from .signals import content_changed
+
+# kind -> (model, natural key columns or None)
+IMPORTABLE = {
+    "news": (News, ("slug",)),
+    "pages": (Page, ("slug",)),
+    "events": (Event, None),
+    "faculty": (Faculty, None),
+    "alumni": (Alumni, None),
+    "programs": (Program, None),
+    "achievements": (Achievement, None),
+    "projects": (FundedProject, None),
+    "newsletters": (Newsletter, None),
+    "mous": (MoU, None),
+    "placement-stats": (PlacementStat, None),
+    "albums": (GalleryAlbum, None),
+    "gallery-images": (GalleryImage, None),
+    "hero-slides": (HeroSlide, None),
+}
+
+BATCH_SIZE = 2000
+MAX_REPORTED_ERRORS = 50
+
+_TRUE = {"1", "true", "t", "yes", "y", "on"}
+_FALSE = {"0", "false", "f", "no", "n", "off", ""}
+
+# Never taken from the file: set by the importer so caches see the change.
+_STAMPS = ("created_at", "updated_at")
+
+
+class ContentImportError(ValueError):
+    """A problem with the file as a whole (bad format, unknown columns)."""
+
+
+# --- readers ---------------------------------------------------------------
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+def _format_of(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    for ext, fmt in ((".csv", "csv"), (".jsonl", "jsonl"), (".ndjson", "jsonl"), (".json", "json")):
+        if name.lower().endswith(ext):
+            return fmt
+    raise ContentImportError(f"Unknown file type: {path} (use .csv, .jsonl or .json)")
+
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """Yield the objects of a top-level JSON array without loading the file."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    fill()
+    skip_ws()
+    if buf[pos:pos + 1] != "[":
+        raise ContentImportError("JSON file must contain an array of objects")
+    pos += 1
+    while True:
+        skip_ws()
+        if buf[pos:pos + 1] == "]":
+            return
+        if buf[pos:pos + 1] == ",":
+            pos += 1
+            skip_ws()
+        while True:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+                break
+            except json.JSONDecodeError:
+                if eof:
+                    raise ContentImportError("Truncated or invalid JSON array")
+                fill()
+        pos = end
+        yield obj
+
+
+class InvalidRecord(ValueError):
+    """Stands in for a record that could not be parsed (one bad JSON line)."""
+
+
+def iter_rows(path):
+    """Yield (line_or_index, dict) for each record in the file; InvalidRecord for unparsable lines."""
+    fmt = _format_of(path)
+    with _open(path) as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        elif fmt == "jsonl":
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield n, json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        # reported as a skipped row, like a CSV row that fails validation
+                        yield n, InvalidRecord(f"invalid JSON: {exc.msg} (column {exc.colno})")
+        else:
+            for n, obj in enumerate(_iter_json_array(f), 1):
+                yield n, obj
+
+
+# --- validation ------------------------------------------------------------
+
+def _coerce(column, value):
+    """File value -> Python value for `column`; raises ValueError."""
+    if isinstance(value, str):
+        value = value.strip()
+    if value is None or value == "":
+        if isinstance(column.type, String) and not column.nullable:
+            return ""
+        return None
+
+    ctype = column.type
+    if isinstance(ctype, Boolean):
+        if isinstance(value, bool):
+            return value
+        v = str(value).lower()
+        if v in _TRUE:
+            return True
+        if v in _FALSE:
+            return False
+        raise ValueError(f"not a boolean: {value!r}")
+    if isinstance(ctype, Integer):
+        if isinstance(value, bool):
+            raise ValueError(f"not an integer: {value!r}")
+        return int(value)
+    if isinstance(ctype, DateTime):
+        return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if isinstance(ctype, Date):
+        return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+    value = str(value)
+    if getattr(ctype, "length", None) and len(value) > ctype.length:
+        raise ValueError(f"longer than {ctype.length} characters")
+    return value
+
+
+def _default(column):
+    d = column.default
+    if d is None:
+        return None
+    if d.is_callable:
+        return d.arg(None)
+    return d.arg if d.is_scalar else None
+
+
+class _Schema:
+    """Column set for one import: the model's columns, with or without id."""
+
+    def __init__(self, model, key, header, variants_for=None):
+        self.model = model
+        self.table = model.__table__
+        self.derived = derived_columns(model)   # rendered column -> source column
+        self.variants_for = variants_for
+        cols = {c.name: c for c in self.table.columns}
+
+        unknown = [h for h in header if h not in cols]
+        if unknown:
+            raise ContentImportError(f"Unknown column(s) for {self.table.name}: {', '.join(unknown)}")
+
+        with_id = "id" in header
+        self.key = tuple(key) if key else (("id",) if with_id else None)
+        self.columns = [c for c in self.table.columns if c.name != "id" or with_id]
+        self.names = [c.name for c in self.columns]
+        # A rendered column is written whenever its source is
+        self.provided = ((set(header) - set(self.derived))
+                         | {r for r, source in self.derived.items() if source in header})
+
+        missing_key = [k for k in self.key or () if k not in header]
+        if missing_key:
+            raise ContentImportError(f"{self.table.name} is upserted on {', '.join(self.key)}; "
+                                     f"missing column(s): {', '.join(missing_key)}")
+
+    def row(self, raw):
+        """Validated dict with every column of the import, or raise ValueError."""
+        out = {}
+        for column in self.columns:
+            name = column.name
+            if name in _STAMPS or name in self.derived:
+                out[name] = _default(column)
+                continue
+            if name in raw:
+                try:
+                    value = _coerce(column, raw[name])
+                except (TypeError, ValueError) as exc:
+                    raise ValueError(f"{name}: {exc}") from None
+            else:
+                value = _default(column)
+            if value is None and not column.nullable:
+                value = _default(column)
+                if value is None:
+                    raise ValueError(f"{name}: required")
+            out[name] = value
+        extra = set(raw) - set(self.names)
+        if extra:
+            raise ValueError(f"unknown column(s): {', '.join(sorted(map(str, extra)))}")
+        return process_values(self.model, out, self.variants_for, provided=self.provided)
+
+
+# --- writers ---------------------------------------------------------------
+
+def _update_columns(schema):
+    # Existing rows only take the columns the file actually has (plus updated_at).
+    return [n for n in schema.names
+            if n not in (schema.key or ()) and (n in schema.provided or n == "updated_at")]
+
+
+def _write_sqlite(connection, schema, rows):
+    stmt = sqlite_insert(schema.table)
+    if schema.key:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(schema.key),
+            set_={n: stmt.excluded[n] for n in _update_columns(schema)})
+    connection.execute(stmt, rows)
+
+
+def _copy_rows(cursor, table_name, names, rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([r"\N" if row[n] is None else row[n] for n in names])
+    buf.seek(0)
+    cols = ", ".join(f'"{n}"' for n in names)
+    sql = f"COPY {table_name} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    if hasattr(cursor, "copy_expert"):        # psycopg2
+        cursor.copy_expert(sql, buf)
+    else:                                     # psycopg 3
+        with cursor.copy(sql) as copy:
+            copy.write(buf.getvalue())
+
+
+def _last_per_key(rows, key):
+    """One row per key value, the last one winning (as row-by-row upserts
+    would); ON CONFLICT DO UPDATE rejects a key repeated in one statement."""
+    return list({tuple(row[k] for k in key): row for row in rows}.values())
+
+
+def _write_postgres(connection, schema, rows):
+    raw = connection.connection.dbapi_connection
+    table = schema.table.name
+    if not schema.key:
+        with raw.cursor() as cur:
+            _copy_rows(cur, f'"{table}"', schema.names, rows)
+        return
+
+    connection.execute(text(
+        f'CREATE TEMP TABLE IF NOT EXISTS "_import_{table}" '
+        f'(LIKE "{table}" INCLUDING DEFAULTS) ON COMMIT DROP'))
+    connection.execute(text(f'TRUNCATE "_import_{table}"'))
+    with raw.cursor() as cur:
+        _copy_rows(cur, f'"_import_{table}"', schema.names, _last_per_key(rows, schema.key))
+
+    cols = ", ".join(f'"{n}"' for n in schema.names)
+    select = text(f'SELECT {cols} FROM "_import_{table}"').columns(
+        *[schema.table.c[n] for n in schema.names])
+    stmt = pg_insert(schema.table).from_select(schema.names, select)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(schema.key),
+        set_={n: stmt.excluded[n] for n in _update_columns(schema)})
+    connection.execute(stmt)
+
+
+def _write_generic(connection, schema, rows):
+    if schema.key:
+        raise ContentImportError(f"Upserts are not supported on {connection.dialect.name}")
+    connection.execute(insert(schema.table), rows)
+
+
+def _writer(dialect):
+    return {"sqlite": _write_sqlite, "postgresql": _write_postgres}.get(dialect, _write_generic)
+
+
+# --- entry point -----------------------------------------------------------
+
+def import_content(kind, path, batch_size=BATCH_SIZE, dry_run=False, strict=False,
+                   reindex=True) -> dict:
+    """
+    Import one file into the model registered as `kind`.
+
+    Invalid rows are skipped and reported; with `strict` the first one aborts
+    the import and nothing is written. Returns counts and the first errors.
+    """
+    if kind not in IMPORTABLE:
+        raise ContentImportError(f"Unknown content kind {kind!r} (one of: {', '.join(IMPORTABLE)})")
+    model, key = IMPORTABLE[kind]
+
+    connection = db.session.connection()
+    write = _writer(connection.dialect.name)
+    rows_iter = iter_rows(path)
+    result = {"written": 0, "skipped": 0, "errors": []}
+
+    # Columns come from the first parsable record
+    leading = []
+    first = next(rows_iter, None)
+    while first is not None and isinstance(first[1], InvalidRecord):
+        leading.append(first)
+        first = next(rows_iter, None)
+    if first is None and not leading:
+        return result
+    schema = _Schema(model, key, list(first[1]), variant_lookup(connection)) if first else None
+
+    batch = []
+
+    def flush():
+        if batch and not dry_run:
+            write(connection, schema, batch)
+        result["written"] += len(batch)
+        batch.clear()
+
+    try:
+        for where, raw in chain(leading, [first] if first else [], rows_iter):
+            try:
+                if isinstance(raw, InvalidRecord):
+                    raise raw
+                if not isinstance(raw, dict):
+                    raise ValueError("record is not an object")
+                batch.append(schema.row(raw))
+            except ValueError as exc:
+                if strict:
+                    raise ContentImportError(f"row {where}: {exc}") from None
+                result["skipped"] += 1
+                if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                    result["errors"].append((where, str(exc)))
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if dry_run:
+        db.session.rollback()
+        return result
+
+    if schema and "id" in schema.names and connection.dialect.name == "postgresql":
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{schema.table.name}', 'id'),"
+            f" COALESCE((SELECT MAX(id) FROM \"{schema.table.name}\"), 1))"))
+    db.session.commit()
+
+    if reindex:
+        from .search import SOURCES, reindex_all
+        if model in SOURCES:
+            reindex_all([model])
+    content_changed.send(model, model=None)
+    return result
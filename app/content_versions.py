@@ -0,0 +1,277 @@
+"""
+Content versions shared by every worker on the host.
+
+Each table has a counter in a small memory-mapped file under instance/
+(one file per database URL). A commit that touched the table bumps its
+counter, so the process-local caches (site chrome, home sections, image
+variants, full responses, identities) can tell on every request, with a
+couple of memory reads and no query, whether another gunicorn worker or a
+CLI import has changed what they were built from.
+
+Bumps come from:
+  * session events: tables of the rows flushed (and Core insert/update/delete
+    run through the session) are collected and bumped after the commit;
+  * `content_changed`: the CMS views, `flask import-content` and the gallery
+    ingest send it after committing, which also covers writes made on a raw
+    connection.
+
+Layout: a 64 byte header (magic, slot count, random epoch) followed by
+fixed slots of (crc32 of the table name, version, last change as a unix
+timestamp). Writers take an flock for the read-modify-write; readers don't
+lock. The epoch changes whenever the file is recreated, so ETags built from
+the counters can't repeat after it is deleted.
+
+Changes made outside the app (sqlite3 shell, psql) are invisible here;
+run `flask content-versions --bump` afterwards.
+"""
+import hashlib
+import mmap
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no cross-process lock needed
+    fcntl = None
+
+from .signals import content_changed
+
+MAGIC = b"CVR1"
+SLOTS = 256
+_HEADER = struct.Struct("<4sIQ")     # magic, slots, epoch
+_SLOT = struct.Struct("<IIQd")       # crc32(table), unused, version, changed_at
+HEADER_SIZE = 64
+FILE_SIZE = HEADER_SIZE + SLOTS * _SLOT.size
+
+
+def _crc(table: str) -> int:
+    # never 0, which marks an empty slot
+    return zlib.crc32(table.encode("utf-8")) or 1
+
+
+class VersionRegistry:
+    """The mmap'd version file. Opened lazily, so each forked worker maps it itself."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = None
+        self._fd = None
+        self._epoch = 0
+        self._slot_of = {}          # table name -> slot offset
+        self._lock = threading.Lock()
+
+    def _open(self):
+        with self._lock:
+            if self._map is not None:
+                return
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                with _flock(fd):
+                    if os.fstat(fd).st_size < FILE_SIZE:
+                        os.ftruncate(fd, FILE_SIZE)
+                    mm = mmap.mmap(fd, FILE_SIZE)
+                    magic, _slots, epoch = _HEADER.unpack_from(mm, 0)
+                    if magic != MAGIC:
+                        epoch = random.getrandbits(63) or 1
+                        mm[:FILE_SIZE] = bytes(FILE_SIZE)
+                        _HEADER.pack_into(mm, 0, MAGIC, SLOTS, epoch)
+            except BaseException:
+                os.close(fd)
+                raise
+            self._fd, self._epoch, self._map = fd, epoch, mm
+
+    def _offset(self, table: str, create: bool):
+        """Byte offset of the table's slot (open addressing on crc32), or None."""
+        offset = self._slot_of.get(table)
+        if offset is not None:
+            return offset
+        crc = _crc(table)
+        mm = self._map
+        start = crc % SLOTS
+        for i in range(SLOTS):
+            offset = HEADER_SIZE + ((start + i) % SLOTS) * _SLOT.size
+            found = _SLOT.unpack_from(mm, offset)[0]
+            if found == crc:
+                self._slot_of[table] = offset
+                return offset
+            if found == 0:
+                if not create:
+                    return None
+                _SLOT.pack_into(mm, offset, crc, 0, 0, 0.0)
+                self._slot_of[table] = offset
+                return offset
+        raise RuntimeError(f"{self.path}: all {SLOTS} version slots are in use")
+
+    def read(self, tables) -> tuple:
+        """((version, changed_at), ...) for `tables`; (0, 0.0) for tables never bumped."""
+        if self._map is None:
+            self._open()
+        out = []
+        for table in tables:
+            offset = self._slot_of.get(table)
+            if offset is None:
+                offset = self._offset(table, create=False)
+            if offset is None:
+                out.append((0, 0.0))
+            else:
+                _crc32, _unused, version, changed_at = _SLOT.unpack_from(self._map, offset)
+                out.append((version, changed_at))
+        return tuple(out)
+
+    def versions(self, tables) -> tuple:
+        return tuple(v for v, _at in self.read(tables))
+
+    def bump(self, tables) -> None:
+        tables = sorted(set(tables))
+        if not tables:
+            return
+        if self._map is None:
+            self._open()
+        now = time.time()
+        with self._lock, _flock(self._fd):
+            for table in tables:
+                offset = self._offset(table, create=True)
+                crc, unused, version, _at = _SLOT.unpack_from(self._map, offset)
+                _SLOT.pack_into(self._map, offset, crc, unused, version + 1, now)
+
+    @property
+    def epoch(self) -> int:
+        if self._map is None:
+            self._open()
+        return self._epoch
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                os.close(self._fd)
+                self._map = self._fd = None
+                self._slot_of.clear()
+
+
+class _flock:
+    def __init__(self, fd):
+        self.fd = fd
+
+    def __enter__(self):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+# --- app-facing helpers -----------------------------------------------------
+
+def _table(model_or_table) -> str:
+    table = getattr(model_or_table, "__table__", model_or_table)
+    return getattr(table, "name", table)
+
+
+def registry():
+    """The current app's registry, or None when disabled / outside an app."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("content_versions")
+
+
+def versions(models):
+    """Version tuple for `models` (classes or table names); None when there is no registry."""
+    reg = registry()
+    if reg is None:
+        return None
+    return reg.versions([_table(m) for m in models])
+
+
+def stamp(models):
+    """(token, last_modified) for `models`, like response_cache.content_version() but query-free."""
+    reg = registry()
+    rows = reg.read([_table(m) for m in models])
+    token = f"{reg.epoch}:" + "|".join(str(v) for v, _at in rows)
+    newest = max((at for _v, at in rows), default=0.0)
+    last_modified = datetime.fromtimestamp(int(newest), timezone.utc).replace(tzinfo=None) if newest else None
+    return token, last_modified
+
+
+def bump(*models) -> None:
+    reg = registry()
+    if reg is not None:
+        reg.bump(_table(m) for m in models)
+
+
+# --- bumping from the session -------------------------------------------------
+
+_TOUCHED = "content_versions.touched"
+
+
+def _touched(session) -> set:
+    return session.info.setdefault(_TOUCHED, set())
+
+
+def _after_flush(session, flush_context):
+    touched = _touched(session)
+    for obj in session.new:
+        touched.add(obj.__table__.name)
+    for obj in session.deleted:
+        touched.add(obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            touched.add(obj.__table__.name)
+
+
+def mark_changed(session, *models) -> None:
+    """Bump `models` when `session` commits; for writes made on session.connection() directly."""
+    _touched(session).update(_table(m) for m in models)
+
+
+def _do_orm_execute(state):
+    # session.execute(insert(Model), rows) and friends bypass the flush
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None and getattr(table, "name", None):
+            _touched(state.session).add(table.name)
+
+
+def _after_commit(session):
+    touched = session.info.pop(_TOUCHED, None)
+    if touched:
+        reg = registry()
+        if reg is not None:
+            reg.bump(touched)
+
+
+def _after_rollback(session):
+    session.info.pop(_TOUCHED, None)
+
+
+@content_changed.connect
+def _on_content_changed(sender, **kwargs):
+    if getattr(sender, "__table__", None) is not None:
+        bump(sender)
+
+
+def default_path(app) -> str:
+    digest = hashlib.sha1(app.config["SQLALCHEMY_DATABASE_URI"].encode("utf-8")).hexdigest()[:12]
+    return os.path.join(app.instance_path, f"content-versions-{digest}.bin")
+
+
+def init_content_versions(app, db) -> None:
+    """Attach the registry to `app` and hook the session. The file is opened on first use."""
+    if not app.config.get("CONTENT_VERSIONS_ENABLED", True):
+        return
+    path = app.config.get("CONTENT_VERSIONS_PATH") or default_path(app)
+    app.extensions["content_versions"] = VersionRegistry(path)
+
+    for name, fn in (("after_flush", _after_flush), ("do_orm_execute", _do_orm_execute),
+                     ("after_commit", _after_commit), ("after_rollback", _after_rollback)):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
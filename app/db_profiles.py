@@ -0,0 +1,158 @@
+"""
+Database engine profiles, picked from the database URL.
+
+SQLite (default, instance/site.db)
+    WAL journal so readers never block on a writer, synchronous=NORMAL,
+    memory-mapped reads, a busy timeout instead of instant "database is
+    locked", and `PRAGMA query_only` for GET/HEAD requests so public page
+    views can never take the write lock.
+
+Postgres (DATABASE_URL=postgresql://...)
+    Sized connection pool with pre-ping and recycling, plus a server-side
+    statement timeout.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from flask import Flask, has_request_context, request
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def engine_options(uri: str) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for the given database URL."""
+    backend = make_url(uri).get_backend_name()
+
+    if backend == "sqlite":
+        return {
+            "connect_args": {
+                "timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000,
+                "check_same_thread": False,
+            },
+        }
+
+    if backend == "postgresql":
+        return {
+            "pool_size": _env_int("DB_POOL_SIZE", 5),
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+            "pool_timeout": _env_int("DB_POOL_TIMEOUT", 10),
+            "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": True,
+            "connect_args": {
+                "options": f"-c statement_timeout={_env_int('DB_STATEMENT_TIMEOUT_MS', 5000)}",
+            },
+        }
+
+    return {}
+
+
+def sqlite_pragmas() -> dict:
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+        "temp_store": "MEMORY",
+    }
+
+
+def _is_read_only_request() -> bool:
+    return has_request_context() and request.method in ("GET", "HEAD")
+
+
+def init_db_profile(app: Flask, db) -> None:
+    """Attach per-connection settings to the app's engine. Call after db.init_app()."""
+    with app.app_context():
+        engine = db.engine
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas()
+    in_memory = engine.url.database in (None, "", ":memory:")
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            if in_memory and name in ("journal_mode", "mmap_size"):
+                continue
+            cur.execute(f"PRAGMA {name}={value}")
+        cur.close()
+
+    if app.config.get("SQLITE_READ_ONLY_GETS", True):
+        @event.listens_for(db.session, "after_begin")
+        def _read_only_for_gets(session, transaction, connection):
+            if connection.dialect.name == "sqlite":
+                flag = "ON" if _is_read_only_request() else "OFF"
+                connection.exec_driver_sql(f"PRAGMA query_only={flag}")
+
+
+@contextmanager
+def time_budget(connection, ms: int):
+    """
+    Abort statements on `connection` that run past `ms` milliseconds.
+
+    SQLite interrupts through a progress handler (sqlite3.OperationalError
+    "interrupted"); Postgres uses SET LOCAL statement_timeout (QueryCanceled).
+    Both surface as sqlalchemy.exc.OperationalError.
+    """
+    if not ms:
+        yield
+        return
+
+    if connection.dialect.name == "sqlite":
+        raw = connection.connection.dbapi_connection
+        deadline = time.perf_counter() + ms / 1000
+        raw.set_progress_handler(lambda: time.perf_counter() > deadline, 1000)
+        try:
+            yield
+        finally:
+            raw.set_progress_handler(None, 1000)
+    elif connection.dialect.name == "postgresql":
+        previous = connection.execute(text("SHOW statement_timeout")).scalar()
+        connection.execute(text(f"SET LOCAL statement_timeout = {int(ms)}"))
+        yield
+        # On a timeout the caller rolls back, which discards the SET LOCAL anyway.
+        connection.execute(text("SELECT set_config('statement_timeout', :v, true)"), {"v": previous})
+    else:
+        yield
+
+
+def configured(app: Flask, db) -> dict:
+    """The settings init_db_profile() applies, without opening a connection."""
+    with app.app_context():
+        engine = db.engine
+    info = {"dialect": engine.dialect.name, "url": engine.url.render_as_string(hide_password=True),
+            "pool": type(engine.pool).__name__}
+
+    if engine.dialect.name == "sqlite":
+        info.update(sqlite_pragmas())
+        info["read_only_gets"] = app.config.get("SQLITE_READ_ONLY_GETS", True)
+    else:
+        options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+        info.update({k: v for k, v in options.items() if k.startswith("pool_") or k == "max_overflow"})
+        if "options" in options.get("connect_args", {}):
+            info["connect_options"] = options["connect_args"]["options"]
+    return info
+
+
+def describe(db) -> dict:
+    """Active engine/pool settings as reported by the database itself."""
+    engine = db.engine
+    info = {"dialect": engine.dialect.name, "url": engine.url.render_as_string(hide_password=True),
+            "pool": engine.pool.status()}
+
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "temp_store"):
+                info[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+        elif engine.dialect.name == "postgresql":
+            info["statement_timeout"] = conn.execute(text("SHOW statement_timeout")).scalar()
+            info["server_version"] = conn.execute(text("SHOW server_version")).scalar()
+    return info
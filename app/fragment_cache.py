@@ -0,0 +1,138 @@
+"""
+Template fragment cache and compiled-template cache.
+
+    {% cache "footer", content_version("SiteSettings") %}
+      ... rendered once, reused until SiteSettings changes ...
+    {% endcache %}
+
+The first argument is the key (any hashable value: a string or a tuple that
+includes whatever else the fragment depends on, e.g. an album id or the
+query string), the second the version it was rendered at. An entry is
+reused only while the version is unchanged; `content_version(*models)`
+reads the shared per-table versions (app/content_versions.py), so a save in
+any worker invalidates the fragment everywhere. A version of None (e.g.
+with CONTENT_VERSIONS_ENABLED off) renders the body every time.
+
+Entries live in a per-process LRU bounded by FRAGMENT_CACHE_MAX_BYTES.
+The template name, script root and asset-manifest version are part of
+every key, so URLs baked into a fragment can't outlive a deploy.
+
+Compiled templates are written to instance/jinja-bytecode/ so freshly
+started workers load bytecode instead of compiling every template again.
+"""
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from flask import Flask, current_app, has_request_context, request
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+
+from . import content_versions
+from .extensions import db
+
+
+class FragmentStore:
+    """Size-bounded LRU of rendered fragments: key -> (version, markup)."""
+
+    def __init__(self, max_bytes: int, max_entries: int = 4096):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, markup) -> None:
+        cost = len(markup)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+            self._entries[key] = (version, markup)
+            self.size += cost
+            while self.size > self.max_bytes or len(self._entries) > self.max_entries:
+                _key, (_version, dropped) = self._entries.popitem(last=False)
+                self.size -= len(dropped)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FragmentCacheExtension(Extension):
+    """Adds `{% cache key, version %}...{% endcache %}`."""
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_store=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = parser.parse_expression()
+        parser.stream.expect("comma")
+        version = parser.parse_expression()
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        args = [nodes.Const(parser.name), key, version]
+        return nodes.CallBlock(self.call_method("_render", args), [], [], body).set_lineno(lineno)
+
+    def _render(self, template, key, version, caller):
+        store = self.environment.fragment_store
+        if store is None or version is None or not has_request_context():
+            return caller()
+
+        assets = current_app.extensions.get("assets", {}).get("version")
+        full_key = (template, key, request.script_root, assets)
+        markup = store.get(full_key, version)
+        if markup is None:
+            markup = caller()
+            store.put(full_key, version, markup)
+        return markup
+
+
+@lru_cache(maxsize=None)
+def _tables_by_name() -> dict:
+    return {m.class_.__name__: m.local_table.name for m in db.Model.registry.mappers}
+
+
+def content_version(*names):
+    """Template helper: shared version of the named models (class or table names), or None."""
+    tables = _tables_by_name()
+    return content_versions.versions([tables.get(n, n) for n in names])
+
+
+def clear() -> None:
+    store = current_app.jinja_env.fragment_store
+    if store is not None:
+        store.clear()
+
+
+def init_template_caches(app: Flask) -> None:
+    env = app.jinja_env
+    env.add_extension(FragmentCacheExtension)
+    if app.config.get("FRAGMENT_CACHE_ENABLED", True):
+        env.fragment_store = FragmentStore(app.config.get("FRAGMENT_CACHE_MAX_BYTES", 8 * 1024 * 1024))
+    env.globals["content_version"] = content_version
+
+    if app.config.get("TEMPLATE_BYTECODE_CACHE", True):
+        directory = os.path.join(app.instance_path, "jinja-bytecode")
+        os.makedirs(directory, exist_ok=True)
+        env.bytecode_cache = FileSystemBytecodeCache(directory)
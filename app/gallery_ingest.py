@@ -0,0 +1,169 @@
+"""
+Bulk gallery ingestion.
+
+Takes a folder or a .zip of event photos, decodes/orients/resizes them in a
+process pool and inserts every GalleryImage row for the album in one
+batched transaction. Used by the "Bulk upload" admin screen and by
+`flask ingest-gallery`.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from PIL import Image, ImageOps
+from sqlalchemy import insert
+from werkzeug.utils import secure_filename
+
+from .extensions import db
+from .models import GalleryAlbum, GalleryImage, ImageVariant
+from .signals import content_changed
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+FULL_WIDTH = 1600
+THUMB_WIDTH = 480
+
+
+def _is_image(name: str) -> bool:
+    base = os.path.basename(name)
+    return not base.startswith(".") and base.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _extract_zip(path: str, workdir: str) -> list:
+    found = []
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not _is_image(info.filename):
+                continue
+            # Never trust paths inside the archive: extract under a temp name
+            fd, target = tempfile.mkstemp(dir=workdir, suffix=".img")
+            with zf.open(info) as src, os.fdopen(fd, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            found.append((target, os.path.basename(info.filename)))
+    return found
+
+
+def collect_sources(source: str, workdir: str) -> list:
+    """
+    Return (path, original_name) for every photo in a folder, a zip, or a
+    folder containing zips. Zip members are extracted into `workdir`.
+    """
+    if os.path.isdir(source):
+        found = []
+        for root, _dirs, files in os.walk(source):
+            for f in sorted(files):
+                path = os.path.join(root, f)
+                if _is_image(f):
+                    found.append((path, f))
+                elif f.lower().endswith(".zip") and zipfile.is_zipfile(path):
+                    found.extend(_extract_zip(path, workdir))
+        return found
+
+    if zipfile.is_zipfile(source):
+        return _extract_zip(source, workdir)
+
+    if os.path.isfile(source) and _is_image(source):
+        return [(source, os.path.basename(source))]
+    raise ValueError(f"Not a folder, zip or image: {source}")
+
+
+def _process_one(job):
+    """Runs in a worker process: write full-size and thumbnail WebP for one photo."""
+    src, name, out_dir = job
+    try:
+        with open(src, "rb") as fh:
+            digest = hashlib.sha1(fh.read()).hexdigest()[:10]
+        stem = secure_filename(os.path.splitext(name)[0]) or "photo"
+
+        with Image.open(src) as im:
+            im = ImageOps.exif_transpose(im)
+            if im.mode not in ("RGB", "RGBA"):
+                im = im.convert("RGB")
+
+            full = im.copy()
+            full.thumbnail((FULL_WIDTH, FULL_WIDTH * 4), Image.LANCZOS)
+            full_name = f"{stem}-{digest}.webp"
+            full.save(os.path.join(out_dir, full_name), "WEBP", quality=82)
+
+            thumb = im.copy()
+            thumb.thumbnail((THUMB_WIDTH, THUMB_WIDTH * 4), Image.LANCZOS)
+            thumb_name = f"{stem}-{digest}-{THUMB_WIDTH}w.webp"
+            thumb.save(os.path.join(out_dir, thumb_name), "WEBP", quality=78)
+
+        return {"ok": True, "name": name, "full": full_name, "thumb": thumb_name,
+                "thumb_size": thumb.size, "caption": stem.replace("_", " ")}
+    except Exception as e:  # a broken photo must not sink the whole batch
+        return {"ok": False, "name": name, "error": str(e)}
+
+
+def ingest(album_id: int, source: str, workers=None, with_captions=False) -> dict:
+    """Process every photo in `source` and attach it to the album. Needs an app context."""
+    album = db.session.get(GalleryAlbum, album_id)
+    if album is None:
+        raise ValueError(f"Album {album_id} not found")
+
+    rel_dir = f"images/gallery/{album_id}"
+    out_dir = os.path.join(current_app.static_folder, *rel_dir.split("/"))
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or current_app.config.get("GALLERY_INGEST_WORKERS") or os.cpu_count()
+
+    workdir = tempfile.mkdtemp(prefix="gallery-ingest-")
+    try:
+        sources = collect_sources(source, workdir)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_process_one, [(p, n, out_dir) for p, n in sources], chunksize=4))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    done = [r for r in results if r["ok"]]
+    failed = [r for r in results if not r["ok"]]
+
+    # File names carry a content hash, so re-uploading the same photo is a no-op
+    existing = {url for (url,) in db.session.query(GalleryImage.image_url).filter_by(album_id=album_id)}
+
+    image_rows, variant_rows = [], []
+    for r in done:
+        url = f"/static/{rel_dir}/{r['full']}"
+        if url in existing:
+            continue
+        existing.add(url)
+        image_rows.append({"album_id": album_id, "image_url": url,
+                           "caption": r["caption"] if with_captions else ""})
+        w, h = r["thumb_size"]
+        variant_rows.append({"source_url": url, "url": f"/static/{rel_dir}/{r['thumb']}",
+                             "width": w, "height": h, "format": "webp"})
+
+    # One transaction, executemany for both tables
+    if image_rows:
+        db.session.execute(insert(GalleryImage), image_rows)
+        db.session.execute(insert(ImageVariant), variant_rows)
+        if not album.cover_image_url:
+            album.cover_image_url = image_rows[0]["image_url"]
+        db.session.commit()
+        content_changed.send(GalleryImage, model=None)
+        content_changed.send(ImageVariant, model=None)
+
+    return {"added": len(image_rows), "failed": [(r["name"], r["error"]) for r in failed]}
+
+
+def ingest_in_background(app, album_id: int, source: str, cleanup: bool = False) -> threading.Thread:
+    """Run `ingest` off the request thread (admin uploads). `cleanup` removes `source` afterwards."""
+    def run():
+        with app.app_context():
+            try:
+                result = ingest(album_id, source)
+                app.logger.info("Gallery ingest album=%s added=%s failed=%s",
+                                album_id, result["added"], len(result["failed"]))
+            except Exception:
+                app.logger.exception("Gallery ingest failed for album %s", album_id)
+            finally:
+                if cleanup:
+                    shutil.rmtree(source, ignore_errors=True)
+
+    t = threading.Thread(target=run, name=f"gallery-ingest-{album_id}", daemon=True)
+    t.start()
+    return t
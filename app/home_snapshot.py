@@ -0,0 +1,143 @@
+"""
+Read model for the home page.
+
+The home page used to fire ~11 queries per hit. Here every section is built
+once by a single query, frozen into immutable rows and kept in memory. When
+the CMS changes a model only the sections that read that model are rebuilt
+on the next request; the route itself just renders. Each section remembers
+the shared content version of its model, so a save handled by another
+worker is picked up too.
+"""
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+from sqlalchemy import desc
+
+from . import content_versions
+from .models import (
+    HeroSlide, Page, Program, News, Event, Achievement, MoU, PlacementStat,
+)
+from .read_models import NEWS_CARD
+from .signals import content_changed
+
+PROGRAM_LEVELS = ("UG", "PG", "Research")
+
+
+@lru_cache(maxsize=None)
+def _row_type(model):
+    return namedtuple(model.__name__ + "Row", [c.name for c in model.__table__.columns])
+
+
+def freeze(obj):
+    """Copy an ORM instance into an immutable, session-independent row."""
+    row_type = _row_type(type(obj))
+    return row_type(*(getattr(obj, f) for f in row_type._fields))
+
+
+def _slides():
+    return tuple(freeze(s) for s in (HeroSlide.query
+                                     .filter_by(is_active=True)
+                                     .order_by(HeroSlide.order.asc(), HeroSlide.created_at.desc())
+                                     .all()))
+
+
+def _about_page():
+    page = Page.query.filter_by(slug="about", is_published=True).first()
+    return freeze(page) if page else None
+
+
+def _programs():
+    # One pass over published programs instead of a query per level
+    groups = {level: [] for level in PROGRAM_LEVELS}
+    for p in Program.query.filter_by(is_published=True).order_by(Program.id.asc()).all():
+        groups.setdefault(p.level, []).append(freeze(p))
+    return {level: tuple(rows) for level, rows in groups.items()}
+
+
+def _news():
+    # Cards only: no body_html
+    return tuple(NEWS_CARD.all(NEWS_CARD.query()
+                               .filter(News.is_published.is_(True))
+                               .order_by(desc(News.published_on))
+                               .limit(4)))
+
+
+def _events():
+    return tuple(freeze(e) for e in (Event.query
+                                     .filter_by(is_published=True)
+                                     .order_by(Event.starts_at.asc())
+                                     .limit(4).all()))
+
+
+def _achievements():
+    return tuple(freeze(a) for a in (Achievement.query
+                                     .filter_by(is_published=True)
+                                     .order_by(desc(Achievement.is_featured), desc(Achievement.created_at))
+                                     .limit(6).all()))
+
+
+def _mous():
+    return tuple(freeze(m) for m in MoU.query.filter_by(is_published=True).limit(8).all())
+
+
+def _placement_stats():
+    return tuple(freeze(s) for s in PlacementStat.query.filter_by(is_visible=True).limit(6).all())
+
+
+# section name -> (model it reads, builder)
+SECTIONS = {
+    "slides": (HeroSlide, _slides),
+    "about_page": (Page, _about_page),
+    "programs": (Program, _programs),
+    "news": (News, _news),
+    "events": (Event, _events),
+    "achievements": (Achievement, _achievements),
+    "mous": (MoU, _mous),
+    "placement_stats": (PlacementStat, _placement_stats),
+}
+
+_SECTION_MODELS = tuple(model for model, _build in SECTIONS.values())
+
+_lock = threading.Lock()
+# ({section: content version of its model when built}, {section: value}), swapped as one
+_state = ({}, {})
+
+
+def get_home_snapshot() -> dict:
+    """Return {section: value}, building only the sections that are missing or stale."""
+    current = content_versions.versions(_SECTION_MODELS)
+    wanted = dict(zip(SECTIONS, current)) if current is not None else {}
+    built_at, sections = _state
+    if len(sections) == len(SECTIONS) and built_at == wanted:
+        return sections
+
+    with _lock:
+        built_at, sections = _state
+        fresh = dict(sections)
+        for name, (_model, build) in SECTIONS.items():
+            if name not in fresh or built_at.get(name) != wanted.get(name):
+                fresh[name] = build()
+        _swap(wanted, fresh)
+        return fresh
+
+
+def _swap(built_at, sections):
+    global _state
+    _state = (built_at, sections)
+
+
+def invalidate(model=None) -> None:
+    with _lock:
+        built_at, sections = _state
+        if model is None:
+            _swap({}, {})
+        else:
+            keep = [name for name in sections if SECTIONS[name][0] is not model]
+            _swap({n: built_at[n] for n in keep if n in built_at}, {n: sections[n] for n in keep})
+
+
+@content_changed.connect
+def _on_content_changed(sender, **kwargs):
+    if any(model is sender for model, _build in SECTIONS.values()):
+        invalidate(sender)
@@ -0,0 +1,138 @@
+"""
+Who is logged in, without a database round-trip per request.
+
+Flask-Login calls `load_user` on every admin request (list pages, AJAX
+lookups, exports). The answer only changes when a User row changes, so a
+small detached `Identity(id, email, is_admin)` is cached per process for
+IDENTITY_CACHE_TTL seconds and dropped as soon as that user is updated or
+deleted through the ORM, or, via the shared user-table version, as soon as
+any worker commits a change to the users.
+
+Password hashing uses PASSWORD_HASH_METHOD (any werkzeug method string, e.g.
+"scrypt:16384:8:1" or "pbkdf2:sha256:600000"). Hashes made with a different
+method are upgraded on the next successful login, and at most
+LOGIN_HASH_CONCURRENCY verifications run at once per process so a login
+burst can't pin every core.
+"""
+import threading
+import time
+from functools import lru_cache
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from . import content_versions
+from .extensions import db
+from .models import User
+
+
+class Identity(UserMixin):
+    """Detached stand-in for User on ordinary requests (read-only)."""
+    __slots__ = ("id", "email", "is_admin")
+
+    def __init__(self, id, email, is_admin):
+        self.id, self.email, self.is_admin = id, email, bool(is_admin)
+
+    def __repr__(self):
+        return f"<Identity {self.id} {self.email}>"
+
+
+_cache = {}   # user id -> (expires_at, users content version, Identity)
+_lock = threading.Lock()
+
+
+def load_identity(user_id):
+    try:
+        uid = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    now = time.monotonic()
+    version = content_versions.versions((User,))
+    hit = _cache.get(uid)
+    if hit and hit[0] > now and hit[1] == version:
+        return hit[2]
+
+    row = db.session.query(User.id, User.email, User.is_admin).filter(User.id == uid).first()
+    if row is None:
+        forget(uid)
+        return None
+    identity = Identity(*row)
+    ttl = current_app.config.get("IDENTITY_CACHE_TTL", 60)
+    if ttl > 0:
+        with _lock:
+            _cache[uid] = (now + ttl, version, identity)
+    return identity
+
+
+def forget(user_id=None) -> None:
+    with _lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(user_id, None)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _on_user_change(mapper, connection, target):
+    forget(target.id)
+
+
+# --- password hashing -------------------------------------------------------
+
+_DEFAULT_METHOD = "scrypt"
+_slot = None   # BoundedSemaphore(LOGIN_HASH_CONCURRENCY), created on first login
+
+
+def _method() -> str:
+    if has_app_context():
+        return current_app.config.get("PASSWORD_HASH_METHOD") or _DEFAULT_METHOD
+    return _DEFAULT_METHOD
+
+
+@lru_cache(maxsize=8)
+def _method_prefix(method: str) -> str:
+    # werkzeug expands defaults ("pbkdf2:sha256" -> "pbkdf2:sha256:600000"); compare the expanded form
+    return generate_password_hash("x", method=method).split("$", 1)[0]
+
+
+def hash_password(password: str) -> str:
+    return generate_password_hash(password, method=_method())
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return password_hash.split("$", 1)[0] != _method_prefix(_method())
+
+
+def _semaphore():
+    global _slot
+    with _lock:
+        if _slot is None:
+            _slot = threading.BoundedSemaphore(current_app.config.get("LOGIN_HASH_CONCURRENCY", 2))
+        return _slot
+
+
+class LoginBusy(Exception):
+    """Too many password checks already running in this process."""
+
+
+def verify_password(user, password: str) -> bool:
+    """
+    Check `password` against `user` with bounded concurrency, upgrading the
+    stored hash to PASSWORD_HASH_METHOD on success. Raises LoginBusy when no
+    slot frees up within LOGIN_HASH_WAIT seconds.
+    """
+    slot = _semaphore()
+    if not slot.acquire(timeout=current_app.config.get("LOGIN_HASH_WAIT", 5)):
+        raise LoginBusy()
+    try:
+        ok = check_password_hash(user.password_hash, password)
+        if ok and needs_rehash(user.password_hash):
+            user.password_hash = hash_password(password)
+            db.session.commit()
+        return ok
+    finally:
+        slot.release()
@@ -0,0 +1,187 @@
+"""
+Responsive image variants.
+
+When an image is saved through the CMS we write resized, re-encoded copies
+at a few fixed widths (static/images/variants/) and record them in
+ImageVariant. Templates then use `responsive_attrs()` / `hero_bg_vars()` so
+phones download a 480px WebP instead of a 3 MB header.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import timezone
+
+from flask import current_app
+from markupsafe import Markup, escape
+from PIL import Image, ImageOps, features
+
+from . import content_versions
+from .extensions import db
+from .models import (
+    ImageVariant, HeroSlide, Faculty, GalleryImage, GalleryAlbum, News, Page, SiteSettings,
+)
+from .signals import content_changed
+
+DEFAULT_WIDTHS = (480, 960, 1600)
+VARIANT_DIR = os.path.join("images", "variants")
+
+# Image columns that get variants when saved in the CMS
+IMAGE_FIELDS = {
+    HeroSlide: ("image_url",),
+    Faculty: ("photo_url",),
+    GalleryImage: ("image_url",),
+    GalleryAlbum: ("cover_image_url",),
+    Page: ("header_image_url",),
+    News: ("cover_image_url",),
+    SiteSettings: ("banner_faculty", "banner_news", "banner_events"),
+}
+
+_lock = threading.Lock()
+# Per-URL LRU of the URLs pages actually render, dropped whenever the
+# ImageVariant content version moves:
+# (version, OrderedDict{source_url: tuple[(url, width, height)]})
+_by_source = None
+
+
+def _static_path(url: str):
+    """'/static/images/x.jpg' -> absolute file path, or None for remote/unknown URLs."""
+    if not url or url.startswith(("http://", "https://", "//")):
+        return None
+    rel = url.split("?", 1)[0].lstrip("/")
+    if rel.startswith("static/"):
+        rel = rel[len("static/"):]
+    path = os.path.normpath(os.path.join(current_app.static_folder, rel.lstrip("/")))
+    if not path.startswith(os.path.abspath(current_app.static_folder)) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def variant_format() -> str:
+    fmt = current_app.config.get("IMAGE_VARIANT_FORMAT", "webp").lower()
+    if fmt == "avif" and not features.check("avif"):
+        fmt = "webp"
+    return fmt
+
+
+def generate_variants(source_url: str, widths=None) -> list:
+    """Write variants for one image and replace its ImageVariant rows. Caller commits."""
+    path = _static_path(source_url)
+    if path is None:
+        return []
+
+    widths = widths or current_app.config.get("IMAGE_VARIANT_WIDTHS", DEFAULT_WIDTHS)
+    fmt = variant_format()
+    out_dir = os.path.join(current_app.static_folder, VARIANT_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    tag = hashlib.sha1(source_url.encode("utf-8")).hexdigest()[:8]
+
+    ImageVariant.query.filter_by(source_url=source_url).delete()
+    rows = []
+    with Image.open(path) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+
+        for w in sorted(set(widths)):
+            if w >= im.width:
+                continue
+            h = round(im.height * w / im.width)
+            name = f"{stem}-{tag}-{w}w.{fmt}"
+            im.resize((w, h), Image.LANCZOS).save(os.path.join(out_dir, name), fmt.upper(), quality=80)
+            row = ImageVariant(source_url=source_url, width=w, height=h, format=fmt,
+                               url="/static/" + VARIANT_DIR.replace(os.sep, "/") + "/" + name)
+            db.session.add(row)
+            rows.append(row)
+
+    invalidate()
+    return rows
+
+
+def ensure_variants(source_url: str) -> bool:
+    """Generate variants unless fresh ones (newer than the file) already exist."""
+    path = _static_path(source_url)
+    if path is None:
+        return False
+
+    oldest = (db.session.query(db.func.min(ImageVariant.created_at))
+              .filter(ImageVariant.source_url == source_url)
+              .scalar())
+    # created_at is naive UTC
+    if oldest is not None and oldest.replace(tzinfo=timezone.utc).timestamp() >= os.path.getmtime(path):
+        return False
+
+    generate_variants(source_url)
+    return True
+
+
+def ensure_model_variants(model) -> bool:
+    changed = False
+    for field in IMAGE_FIELDS.get(type(model), ()):
+        url = getattr(model, field, None)
+        if url:
+            changed = ensure_variants(url) or changed
+    return changed
+
+
+def _variants(url: str) -> tuple:
+    global _by_source
+    current = content_versions.versions((ImageVariant,))
+    with _lock:
+        if _by_source is None or _by_source[0] != current:
+            _by_source = (current, OrderedDict())
+        entries = _by_source[1]
+        found = entries.get(url)
+        if found is not None:
+            entries.move_to_end(url)
+            return found
+
+    rows = (db.session.query(ImageVariant.url, ImageVariant.width, ImageVariant.height)
+            .filter(ImageVariant.source_url == url)
+            .order_by(ImageVariant.width.asc()))
+    found = tuple((v_url, w, h) for v_url, w, h in rows)
+    max_entries = current_app.config.get("IMAGE_VARIANT_CACHE_MAX_ENTRIES", 2048)
+    with _lock:
+        # Only keep it if no bump happened while we were querying
+        if _by_source[0] == current:
+            entries = _by_source[1]
+            entries[url] = found
+            entries.move_to_end(url)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+    return found
+
+
+def invalidate() -> None:
+    global _by_source
+    with _lock:
+        _by_source = None
+
+
+def responsive_attrs(url, sizes="100vw"):
+    """` srcset="..." sizes="..."` for an <img>, or "" when there are no variants."""
+    variants = _variants(url) if url else ()
+    if not variants:
+        return ""
+    srcset = ", ".join(f"{v_url} {w}w" for v_url, w, _h in variants)
+    return Markup(f' srcset="{escape(srcset)}" sizes="{escape(sizes)}"')
+
+
+def hero_bg_vars(url):
+    """CSS custom properties for .page-hero: full image plus small/medium variants."""
+    if not url:
+        return ""
+    css = f"--hero-bg: url('{url}');"
+    variants = _variants(url)
+    if variants:
+        css += f" --hero-bg-sm: url('{variants[0][0]}');"
+        css += f" --hero-bg-md: url('{variants[min(1, len(variants) - 1)][0]}');"
+    return escape(css)
+
+
+@content_changed.connect
+def _on_content_changed(sender, **kwargs):
+    if sender is ImageVariant:
+        invalidate()
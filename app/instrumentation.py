@@ -0,0 +1,217 @@
+"""
+Per-request timing: SQL statement count/time (engine events), Jinja render
+time (template signals) and total latency.
+
+Every response gets a `Server-Timing` header, and per-endpoint histograms
+are kept in memory for the admin "Performance" view and `/metrics`
+(Prometheus text format).
+"""
+import bisect
+import hmac
+import threading
+import time
+from collections import deque
+
+from flask import (
+    Blueprint, Flask, Response, abort, current_app, g, has_request_context, request,
+    before_render_template, template_rendered,
+)
+from sqlalchemy import event
+
+# Upper bounds in milliseconds (Prometheus-style cumulative buckets + "+Inf")
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+RECENT_SAMPLES = 500
+
+
+class EndpointStats:
+    __slots__ = ("count", "latency_sum", "buckets", "queries_sum", "queries_max",
+                 "sql_ms_sum", "render_ms_sum", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.queries_sum = 0
+        self.queries_max = 0
+        self.sql_ms_sum = 0.0
+        self.render_ms_sum = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)  # (latency_ms, queries)
+
+    def add(self, latency_ms, queries, sql_ms, render_ms):
+        self.count += 1
+        self.latency_sum += latency_ms
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.queries_sum += queries
+        self.queries_max = max(self.queries_max, queries)
+        self.sql_ms_sum += sql_ms
+        self.render_ms_sum += render_ms
+        self.recent.append((latency_ms, queries))
+
+    def percentile(self, p):
+        values = sorted(lat for lat, _q in self.recent)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    def summary(self):
+        n = self.count or 1
+        recent_queries = [q for _lat, q in self.recent]
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "avg_ms": self.latency_sum / n,
+            "avg_sql_ms": self.sql_ms_sum / n,
+            "avg_render_ms": self.render_ms_sum / n,
+            "avg_queries": self.queries_sum / n,
+            "last_queries": recent_queries[-1] if recent_queries else 0,
+            "max_queries": self.queries_max,
+        }
+
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def snapshot() -> dict:
+    """{endpoint: summary dict}, sorted by endpoint."""
+    with _lock:
+        return {ep: st.summary() for ep, st in sorted(_stats.items())}
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def _record(endpoint, latency_ms, queries, sql_ms, render_ms):
+    with _lock:
+        st = _stats.get(endpoint)
+        if st is None:
+            st = _stats[endpoint] = EndpointStats()
+        st.add(latency_ms, queries, sql_ms, render_ms)
+
+
+# --- hooks ----------------------------------------------------------------
+
+# The start time lives on the execution context, which is dropped with the
+# statement, so a statement that raises (no after_cursor_execute) leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._perf_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_perf_started", None)
+    if started is None:
+        return
+    if has_request_context() and "_perf_t0" in g:
+        g._perf_queries += 1
+        g._perf_sql += time.perf_counter() - started
+
+
+def _before_render(sender, template, context, **extra):
+    if "_perf_t0" in g:
+        g._perf_render_start.append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    if "_perf_t0" in g and g._perf_render_start:
+        g._perf_render += time.perf_counter() - g._perf_render_start.pop()
+
+
+def _start_timer():
+    g._perf_t0 = time.perf_counter()
+    g._perf_queries = 0
+    g._perf_sql = 0.0
+    g._perf_render = 0.0
+    g._perf_render_start = []
+
+
+def _finish_timer(response):
+    if "_perf_t0" not in g:
+        return response
+
+    total_ms = (time.perf_counter() - g._perf_t0) * 1000
+    sql_ms = g._perf_sql * 1000
+    render_ms = g._perf_render * 1000
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={sql_ms:.1f};desc="{g._perf_queries} queries", '
+        f"render;dur={render_ms:.1f}, app;dur={total_ms:.1f}"
+    )
+    _record(request.endpoint or "<unmatched>", total_ms, g._perf_queries, sql_ms, render_ms)
+    return response
+
+
+# --- /metrics ---------------------------------------------------------------
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+def _metrics_allowed() -> bool:
+    # No token configured: closed. remote_addr can't tell local scrapers apart
+    # from public requests arriving through the local reverse proxy.
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        return False
+    sent = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return hmac.compare_digest(sent.encode("utf-8"), token.encode("utf-8"))
+
+
+def prometheus_text() -> str:
+    lines = [
+        "# HELP site_request_duration_ms Request latency per endpoint.",
+        "# TYPE site_request_duration_ms histogram",
+    ]
+    with _lock:
+        items = sorted(_stats.items())
+        for ep, st in items:
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS_MS + ("+Inf",), st.buckets):
+                cumulative += n
+                lines.append(f'site_request_duration_ms_bucket{{endpoint="{ep}",le="{bound}"}} {cumulative}')
+            lines.append(f'site_request_duration_ms_sum{{endpoint="{ep}"}} {st.latency_sum:.3f}')
+            lines.append(f'site_request_duration_ms_count{{endpoint="{ep}"}} {st.count}')
+
+        lines += ["# HELP site_sql_queries_total SQL statements executed per endpoint.",
+                  "# TYPE site_sql_queries_total counter"]
+        lines += [f'site_sql_queries_total{{endpoint="{ep}"}} {st.queries_sum}' for ep, st in items]
+
+        lines += ["# HELP site_sql_queries_max Most SQL statements seen in one request.",
+                  "# TYPE site_sql_queries_max gauge"]
+        lines += [f'site_sql_queries_max{{endpoint="{ep}"}} {st.queries_max}' for ep, st in items]
+
+        lines += ["# HELP site_sql_duration_ms_total Time spent in SQL per endpoint.",
+                  "# TYPE site_sql_duration_ms_total counter"]
+        lines += [f'site_sql_duration_ms_total{{endpoint="{ep}"}} {st.sql_ms_sum:.3f}' for ep, st in items]
+
+        lines += ["# HELP site_render_duration_ms_total Time spent rendering templates per endpoint.",
+                  "# TYPE site_render_duration_ms_total counter"]
+        lines += [f'site_render_duration_ms_total{{endpoint="{ep}"}} {st.render_ms_sum:.3f}' for ep, st in items]
+    return "\n".join(lines) + "\n"
+
+
+@metrics_bp.get("/metrics")
+def metrics():
+    if not _metrics_allowed():
+        abort(404)
+    return Response(prometheus_text(), mimetype="text/plain; version=0.0.4")
+
+
+def init_instrumentation(app: Flask, db) -> None:
+    if not app.config.get("INSTRUMENTATION_ENABLED", True):
+        return
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    app.before_request(_start_timer)
+    app.after_request(_finish_timer)
+    app.register_blueprint(metrics_bp)
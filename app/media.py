@@ -0,0 +1,371 @@
+"""
+Content-addressed media store for CMS uploads.
+
+Uploaded files are named by the SHA-256 of their bytes
+(media/ab/abcdef...webp), so the same photo uploaded twice, under any name,
+is stored once, two different photos called "about.jpg" can't overwrite each
+other, and every URL can be cached forever. Hashing streams the upload in
+1 MB chunks into a temp file next to the target, which is then renamed into
+place (or dropped when the blob already exists).
+
+`MediaStore` is the backend interface; `LocalMediaStore` keeps blobs under
+app/static/media. MEDIA_STORE picks the backend from BACKENDS, so another
+one (object storage, say) only has to implement the same methods.
+
+Each blob has a MediaBlob row whose refcount is the number of references
+from the columns in MEDIA_FIELDS and from <img> tags in rich text. ORM saves
+keep it current; `flask media-gc` recounts from scratch and deletes blobs
+(and their variants) that nothing has referenced for MEDIA_GC_GRACE_HOURS.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_admin.form.upload import ImageUploadField, ImageUploadInput
+from PIL import Image
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.orm import attributes, object_session
+
+from .extensions import db
+from .images import IMAGE_FIELDS, _static_path
+from .models import Alumni, ImageVariant, MediaBlob, MoU
+from .rich_text import RENDERED, image_sources
+
+CHUNK = 1024 * 1024
+
+# Columns that may hold a media URL (on top of the rich-text sources in RENDERED)
+MEDIA_FIELDS = dict(IMAGE_FIELDS)
+MEDIA_FIELDS.update({Alumni: ("photo_url",), MoU: ("logo_url",)})
+
+# Pillow format -> extension, so identical bytes get one name whatever they were called
+FORMAT_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif", "AVIF": "avif"}
+
+StoredBlob = namedtuple("StoredBlob", "key ext size url created")
+
+
+class MediaStore(ABC):
+    """Where blob bytes live. Keys are hex SHA-256 digests."""
+
+    @abstractmethod
+    def put(self, stream, ext: str) -> StoredBlob:
+        """Store a readable binary stream; returns the blob (created=False if it already existed)."""
+
+    @abstractmethod
+    def exists(self, key: str, ext: str) -> bool: ...
+
+    @abstractmethod
+    def delete(self, key: str, ext: str) -> None: ...
+
+    @abstractmethod
+    def url(self, key: str, ext: str) -> str: ...
+
+    @abstractmethod
+    def keys(self):
+        """Yield (key, ext, size, modified datetime) for every stored blob."""
+
+    def parse_url(self, url):
+        """(key, ext) if `url` points into this store, else None."""
+        return None
+
+
+class LocalMediaStore(MediaStore):
+    def __init__(self, root: str, url_prefix: str):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self._url_re = re.compile(re.escape(self.url_prefix) + r"/[0-9a-f]{2}/([0-9a-f]{64})\.([a-z0-9]{1,10})$")
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, key[:2], f"{key}.{ext}")
+
+    def put(self, stream, ext):
+        ext = ext.lower().lstrip(".")
+        os.makedirs(self.root, exist_ok=True)
+        digest, size = hashlib.sha256(), 0
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter(lambda: stream.read(CHUNK), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            key = digest.hexdigest()
+            path = self._path(key, ext)
+            created = not os.path.exists(path)
+            if created:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return StoredBlob(key, ext, size, self.url(key, ext), created)
+
+    def exists(self, key, ext):
+        return os.path.isfile(self._path(key, ext))
+
+    def delete(self, key, ext):
+        try:
+            os.remove(self._path(key, ext))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key, ext):
+        return f"{self.url_prefix}/{key[:2]}/{key}.{ext}"
+
+    def keys(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in sorted(os.listdir(self.root)):
+            folder = os.path.join(self.root, shard)
+            if len(shard) != 2 or not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                key, _, ext = name.partition(".")
+                if len(key) == 64:
+                    st = os.stat(os.path.join(folder, name))
+                    yield key, ext, st.st_size, datetime.utcfromtimestamp(st.st_mtime)
+
+    def parse_url(self, url):
+        m = self._url_re.match(url or "")
+        return (m.group(1), m.group(2)) if m else None
+
+
+BACKENDS = {"local": LocalMediaStore}
+
+
+def media_store() -> MediaStore:
+    store = current_app.extensions.get("media_store")
+    if store is None:
+        backend = BACKENDS[current_app.config.get("MEDIA_STORE", "local")]
+        store = backend(os.path.join(current_app.static_folder, "media"),
+                        current_app.static_url_path + "/media")
+        current_app.extensions["media_store"] = store
+    return store
+
+
+def save_upload(stream, filename=None, content_type=None) -> str:
+    """Store an upload, record it in MediaBlob (caller commits) and return its URL."""
+    store = media_store()
+    blob = store.put(stream, _extension(stream, filename))
+    known = db.session.scalar(select(MediaBlob).where(MediaBlob.key == blob.key))
+    if known is None:
+        db.session.add(MediaBlob(key=blob.key, ext=blob.ext, size=blob.size, content_type=content_type))
+    elif known.ext != blob.ext:
+        # same bytes uploaded earlier under another extension: keep the first copy
+        if blob.created:
+            store.delete(blob.key, blob.ext)
+        return store.url(known.key, known.ext)
+    return blob.url
+
+
+def _extension(stream, filename):
+    try:
+        stream.seek(0)
+        with Image.open(stream) as im:
+            ext = FORMAT_EXTENSIONS.get(im.format)
+    except (OSError, ValueError):
+        ext = None
+    stream.seek(0)
+    if ext is None and filename and "." in filename:
+        ext = filename.rsplit(".", 1)[1].lower()
+    return ext if ext and re.fullmatch(r"[a-z0-9]{1,10}", ext) else "bin"
+
+
+# --- admin upload field ---------------------------------------------------
+
+class _MediaUploadInput(ImageUploadInput):
+    def get_url(self, field):
+        return field.data   # already a full URL
+
+
+class MediaUploadField(ImageUploadField):
+    """
+    ImageUploadField that saves into the media store and stores the blob URL.
+    Replacing or clearing an image never deletes the old file: other rows may
+    share it, and `flask media-gc` removes it once nothing does.
+    """
+    widget = _MediaUploadInput()
+
+    def __init__(self, label=None, validators=None, **kwargs):
+        kwargs.setdefault("allowed_extensions", ("jpg", "jpeg", "png", "webp", "gif"))
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(label, validators, base_path="", **kwargs)
+
+    def populate_obj(self, obj, name):
+        if self._should_delete:
+            setattr(obj, name, None)
+            return
+        if self._is_uploaded_file(self.data):
+            url = save_upload(self.data.stream, self.data.filename, self.data.mimetype)
+            setattr(obj, name, url)
+
+
+# --- reference counting ---------------------------------------------------
+
+_DELTAS = "media.refcount_deltas"
+
+
+def _keys_in(model, values) -> Counter:
+    """Blob keys referenced by one row, given {column: value}."""
+    store = media_store()
+    urls = [values.get(f) for f in MEDIA_FIELDS.get(model, ())]
+    for source in RENDERED.get(model, {}):
+        urls.extend(image_sources(values.get(source)))
+    found = Counter()
+    for url in urls:
+        parsed = store.parse_url(url)
+        if parsed:
+            found[parsed[0]] += 1
+    return found
+
+
+def _columns(model):
+    return tuple(MEDIA_FIELDS.get(model, ())) + tuple(RENDERED.get(model, {}))
+
+
+def _current(target, model):
+    return {c: getattr(target, c) for c in _columns(model)}
+
+
+def _previous(target, model):
+    values = {}
+    for c in _columns(model):
+        history = attributes.get_history(target, c)
+        if history.deleted:
+            values[c] = history.deleted[0]
+        elif history.unchanged:
+            values[c] = history.unchanged[0]
+        else:
+            values[c] = None
+    return values
+
+
+def _record(target, delta: Counter):
+    session = object_session(target)
+    if session is not None and delta:
+        session.info.setdefault(_DELTAS, Counter()).update(delta)
+
+
+def _after_insert(mapper, connection, target):
+    _record(target, _keys_in(mapper.class_, _current(target, mapper.class_)))
+
+
+def _after_update(mapper, connection, target):
+    model = mapper.class_
+    delta = _keys_in(model, _current(target, model))
+    delta.subtract(_keys_in(model, _previous(target, model)))
+    _record(target, Counter({k: v for k, v in delta.items() if v}))
+
+
+def _after_delete(mapper, connection, target):
+    delta = Counter()
+    delta.subtract(_keys_in(mapper.class_, _previous(target, mapper.class_)))
+    _record(target, delta)
+
+
+def _apply_deltas(session, flush_context):
+    # After the flush every row (including new MediaBlob rows) is in place
+    deltas = session.info.pop(_DELTAS, None)
+    if not deltas:
+        return
+    table = MediaBlob.__table__
+    connection = session.connection()
+    for key, change in deltas.items():
+        if change:
+            connection.execute(update(table).where(table.c.key == key)
+                               .values(refcount=table.c.refcount + change))
+
+
+def _discard_deltas(session):
+    session.info.pop(_DELTAS, None)
+
+
+def register_media_events() -> None:
+    for model in set(MEDIA_FIELDS) | set(RENDERED):
+        for name, fn in (("after_insert", _after_insert), ("after_update", _after_update),
+                         ("after_delete", _after_delete)):
+            if not event.contains(model, name, fn):
+                event.listen(model, name, fn)
+    for name, fn in (("after_flush", _apply_deltas), ("after_rollback", _discard_deltas)):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
+
+
+# --- garbage collection ---------------------------------------------------
+
+def recount() -> dict:
+    """Recompute every refcount from the referencing columns. Returns {key: count}."""
+    counts = Counter()
+    for model in set(MEDIA_FIELDS) | set(RENDERED):
+        columns = _columns(model)
+        table = model.__table__
+        for row in db.session.execute(select(*(table.c[c] for c in columns))).yield_per(1000):
+            counts.update(_keys_in(model, dict(zip(columns, row))))
+
+    table = MediaBlob.__table__
+    for blob_id, key, refcount in db.session.execute(select(table.c.id, table.c.key, table.c.refcount)).all():
+        if counts.get(key, 0) != refcount:
+            db.session.execute(update(table).where(table.c.id == blob_id).values(refcount=counts.get(key, 0)))
+    return counts
+
+
+def collect_garbage(grace_hours=None, dry_run=False) -> dict:
+    """
+    Recount references, then delete blobs unreferenced for `grace_hours`
+    (files, MediaBlob rows and their image variants). Files in the store
+    with no MediaBlob row (an interrupted upload) are indexed or removed
+    by the same rule.
+    """
+    if grace_hours is None:
+        grace_hours = current_app.config.get("MEDIA_GC_GRACE_HOURS", 24)
+    store = media_store()
+    cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+    result = {"blobs": 0, "deleted": [], "bytes": 0, "missing": []}
+
+    counts = recount()
+    indexed = {blob.key: blob for blob in MediaBlob.query.all()}
+    result["blobs"] = len(indexed)
+
+    for key, ext, size, modified in list(store.keys()):
+        if key in indexed:
+            continue
+        if counts.get(key) or modified >= cutoff:
+            if not dry_run:
+                db.session.add(MediaBlob(key=key, ext=ext, size=size, refcount=counts.get(key, 0)))
+            continue
+        result["deleted"].append(store.url(key, ext))
+        if not dry_run:
+            store.delete(key, ext)
+
+    for key, blob in indexed.items():
+        if not store.exists(blob.key, blob.ext):
+            result["missing"].append(store.url(blob.key, blob.ext))
+        if blob.refcount > 0 or blob.updated_at >= cutoff:
+            continue
+        url = store.url(blob.key, blob.ext)
+        result["deleted"].append(url)
+        result["bytes"] += blob.size
+        if dry_run:
+            continue
+        for variant_url in db.session.scalars(select(ImageVariant.url).where(ImageVariant.source_url == url)):
+            path = _static_path(variant_url)
+            if path:
+                # Another worker or a concurrent media-gc may have got there first
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        db.session.execute(delete(ImageVariant).where(ImageVariant.source_url == url))
+        db.session.delete(blob)
+        store.delete(blob.key, blob.ext)
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return result
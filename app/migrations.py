@@ -0,0 +1,163 @@
+"""
+Lightweight schema migrations.
+
+`db.create_all()` creates missing tables but never touches existing ones,
+so indexes and columns added to app/models.py after a database was created
+would never reach it. Each migration here is a small, idempotent function;
+applied ids are recorded in `schema_migrations`. Works on SQLite and
+Postgres. Run with `flask db-upgrade` or `flask init-db` once per deploy
+(and at startup only when AUTO_PROVISION=1).
+
+To add one: append ("NNNN_name", fn) to MIGRATIONS. Use add_index /
+add_column so re-running against a database created by create_all() (which
+already has the new index/column) is a no-op.
+"""
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from .extensions import db
+
+
+def _inspector():
+    return inspect(db.session.connection())
+
+
+def add_index(name: str, table: str, *columns: str, unique: bool = False) -> None:
+    existing = {ix["name"] for ix in _inspector().get_indexes(table)}
+    if name in existing:
+        return
+    cols = ", ".join(f'"{c}"' for c in columns)
+    db.session.execute(text(
+        f'CREATE {"UNIQUE " if unique else ""}INDEX "{name}" ON "{table}" ({cols})'))
+
+
+def add_column(table: str, name: str, ddl: str) -> None:
+    """`ddl` is the column type and constraints, e.g. "TEXT NOT NULL DEFAULT ''"."""
+    existing = {c["name"] for c in _inspector().get_columns(table)}
+    if name in existing:
+        return
+    db.session.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{name}" {ddl}'))
+
+
+# --- migrations -----------------------------------------------------------
+
+def _0001_hot_path_indexes():
+    # Filter + sort columns of the public queries (keyset pagination order incl. id)
+    add_index("ix_news_published_on", "news", "is_published", "published_on", "id")
+    add_index("ix_event_published_starts", "event", "is_published", "starts_at", "id")
+    add_index("ix_faculty_published_order", "faculty", "is_published", "display_order")
+    add_index("ix_hero_slides_active_order", "hero_slides", "is_active", "order")
+    add_index("ix_program_level_published", "program", "level", "is_published")
+    add_index("ix_achievement_published_featured", "achievement", "is_published", "is_featured", "created_at")
+    add_index("ix_funded_project_published_created", "funded_project", "is_published", "created_at", "id")
+    add_index("ix_newsletter_published_on", "newsletter", "is_published", "published_on", "id")
+    add_index("ix_gallery_album_published_year", "gallery_album", "is_published", "year", "id")
+    add_index("ix_gallery_image_album", "gallery_image", "album_id", "id")
+    add_index("ix_alumni_graduation_year", "alumni", "graduation_year", "id")
+
+
+def _0002_enquiry_indexes():
+    # Admin triage list: newest first, optionally filtered by status (keyset order incl. id)
+    add_index("ix_enquiry_created", "enquiry", "created_at", "id")
+    add_index("ix_enquiry_status_created", "enquiry", "status", "created_at", "id")
+
+
+def _add_derived_columns():
+    # render_all() writes every derived column the current models have, so
+    # any migration that calls it needs all of them in place first
+    from .rich_text import RENDERED, SUMMARIES
+
+    for derived in (RENDERED, SUMMARIES):
+        for model, pairs in derived.items():
+            for column in pairs.values():
+                add_column(model.__table__.name, column, "TEXT NOT NULL DEFAULT ''")
+
+
+def _0003_rendered_rich_text():
+    # Sanitised/optimised copies of the rich-text columns, filled in once here
+    from .rich_text import render_all
+
+    _add_derived_columns()
+    render_all()
+
+
+def _0004_media_blobs():
+    # Index of content-addressed uploads; `flask media-gc` adopts files already in the store
+    from .models import MediaBlob
+
+    MediaBlob.__table__.create(bind=db.session.connection(), checkfirst=True)
+
+
+def _0005_rerender_inline_styles():
+    # Inline style is now allowlisted; re-render so stored HTML drops what's no longer kept
+    from .rich_text import render_all
+
+    _add_derived_columns()
+    render_all()
+
+
+def _0006_search_rowids():
+    # Search rows are now addressed by a deterministic rowid; rebuild an existing
+    # SQLite index so rows written before that can still be deleted
+    from .search import reindex_all
+
+    if db.engine.dialect.name == "sqlite" and "search_index" in _inspector().get_table_names():
+        reindex_all()
+
+
+def _0007_rich_text_summaries():
+    # Plain-text excerpts so the faculty/events/alumni lists don't select whole bodies
+    from .rich_text import SUMMARIES, render_all
+
+    _add_derived_columns()
+    render_all(list(SUMMARIES))
+
+
+MIGRATIONS = [
+    ("0001_hot_path_indexes", _0001_hot_path_indexes),
+    ("0002_enquiry_indexes", _0002_enquiry_indexes),
+    ("0003_rendered_rich_text", _0003_rendered_rich_text),
+    ("0004_media_blobs", _0004_media_blobs),
+    ("0005_rerender_inline_styles", _0005_rerender_inline_styles),
+    ("0006_search_rowids", _0006_search_rowids),
+    ("0007_rich_text_summaries", _0007_rich_text_summaries),
+]
+
+
+# --- runner ---------------------------------------------------------------
+
+def _ensure_table():
+    db.session.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " id VARCHAR(120) PRIMARY KEY, applied_at TIMESTAMP NOT NULL)"))
+    db.session.commit()
+
+
+def applied() -> set:
+    _ensure_table()
+    return {r[0] for r in db.session.execute(text("SELECT id FROM schema_migrations"))}
+
+
+def pending() -> list:
+    done = applied()
+    return [mid for mid, _fn in MIGRATIONS if mid not in done]
+
+
+def upgrade() -> list:
+    """Apply pending migrations in order, one transaction each. Returns applied ids."""
+    done = applied()
+    ran = []
+    for mid, fn in MIGRATIONS:
+        if mid in done:
+            continue
+        try:
+            fn()
+            db.session.execute(text("INSERT INTO schema_migrations (id, applied_at) VALUES (:id, :at)"),
+                               {"id": mid, "at": datetime.utcnow()})
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        ran.append(mid)
+    return ran
@@ -1,13 +1,15 @@
 from __future__ import annotations
 from datetime import datetime
 from typing import Optional
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from flask_login import UserMixin
 from .extensions import db, login_manager
 
 @login_manager.user_loader
 def load_user(user_id: str):
-    return User.query.get(int(user_id))
+    # Cached detached identity (id, email, is_admin); see app/identity.py
+    from .identity import load_identity
+    return load_identity(user_id)
 
 class TimestampMixin:
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -20,7 +22,8 @@ class User(UserMixin, db.Model, TimestampMixin):
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
 
     def set_password(self, password: str) -> None:
-        self.password_hash = generate_password_hash(password)
+        from .identity import hash_password
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
         return check_password_hash(self.password_hash, password)
@@ -47,6 +50,7 @@ class Page(db.Model, TimestampMixin):
     slug = db.Column(db.String(120), unique=True, nullable=False, index=True)
     title = db.Column(db.String(255), nullable=False)
     body_html = db.Column(db.Text, nullable=False, default="")
+    body_rendered = db.Column(db.Text, nullable=False, default="")  # app/rich_text.py
     
     header_image_url = db.Column(db.String(500), nullable=True)
     header_subtitle = db.Column(db.String(255), nullable=True)
@@ -55,15 +59,24 @@ class Page(db.Model, TimestampMixin):
     show_in_menu = db.Column(db.Boolean, default=False, nullable=False)
 
 class Program(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_program_level_published", "level", "is_published"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     level = db.Column(db.String(50), nullable=False)  # UG/PG/Research
     name = db.Column(db.String(255), nullable=False)
     overview_html = db.Column(db.Text, default="", nullable=False)
+    overview_rendered = db.Column(db.Text, default="", nullable=False)
     eligibility = db.Column(db.String(255), default="Editable", nullable=False)
     duration = db.Column(db.String(100), default="Editable", nullable=False)
     is_published = db.Column(db.Boolean, default=True, nullable=False)
 
 class Faculty(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_faculty_published_order", "is_published", "display_order"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     designation = db.Column(db.String(255), default="Faculty", nullable=False)
@@ -76,19 +89,30 @@ class Faculty(db.Model, TimestampMixin):
     phone = db.Column(db.String(50), default="", nullable=True)
     photo_url = db.Column(db.String(500), default="", nullable=True)
     bio_html = db.Column(db.Text, default="", nullable=False)
+    bio_rendered = db.Column(db.Text, default="", nullable=False)
+    bio_summary = db.Column(db.Text, default="", nullable=False)      # plain-text excerpt for lists
     is_published = db.Column(db.Boolean, default=True, nullable=False)
 
 class News(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_news_published_on", "is_published", "published_on", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     slug = db.Column(db.String(150), unique=True, nullable=False, index=True)
     summary = db.Column(db.String(500), default="", nullable=False)
     body_html = db.Column(db.Text, default="", nullable=False)
+    body_rendered = db.Column(db.Text, default="", nullable=False)
     cover_image_url = db.Column(db.String(500), default="", nullable=True)
     published_on = db.Column(db.Date, nullable=False, default=datetime.utcnow().date)
     is_published = db.Column(db.Boolean, default=True, nullable=False)
 
 class Event(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_event_published_starts", "is_published", "starts_at", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     location = db.Column(db.String(255), default="Saveetha University, Chennai", nullable=False)
@@ -96,9 +120,15 @@ class Event(db.Model, TimestampMixin):
     ends_at = db.Column(db.DateTime, nullable=True)
     registration_link = db.Column(db.String(500), default="", nullable=True)
     description_html = db.Column(db.Text, default="", nullable=False)
+    description_rendered = db.Column(db.Text, default="", nullable=False)
+    description_summary = db.Column(db.Text, default="", nullable=False)      # plain-text excerpt for lists
     is_published = db.Column(db.Boolean, default=True, nullable=False)
 
 class Achievement(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_achievement_published_featured", "is_published", "is_featured", "created_at"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     category = db.Column(db.String(120), default="Student", nullable=False)
@@ -108,6 +138,10 @@ class Achievement(db.Model, TimestampMixin):
     is_published = db.Column(db.Boolean, default=True, nullable=False)
 
 class FundedProject(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_funded_project_published_created", "is_published", "created_at", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     sponsor = db.Column(db.String(255), default="Editable", nullable=False)
@@ -132,6 +166,10 @@ class PlacementStat(db.Model, TimestampMixin):
     is_visible = db.Column(db.Boolean, default=True, nullable=False)
 
 class Newsletter(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_newsletter_published_on", "is_published", "published_on", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     issue = db.Column(db.String(50), default="Vol 1, Issue 1", nullable=False)
@@ -140,6 +178,11 @@ class Newsletter(db.Model, TimestampMixin):
     is_published = db.Column(db.Boolean, default=True, nullable=False)
 
 class Enquiry(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_enquiry_created", "created_at", "id"),
+        db.Index("ix_enquiry_status_created", "status", "created_at", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     email = db.Column(db.String(255), nullable=False)
@@ -148,6 +191,10 @@ class Enquiry(db.Model, TimestampMixin):
     status = db.Column(db.String(50), default="New", nullable=False)  # New / In Progress / Closed
 
 class GalleryAlbum(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_gallery_album_published_year", "is_published", "year", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     #slug = db.Column(db.String(200), unique=True, nullable=False)   # ADD THIS
@@ -160,6 +207,10 @@ class GalleryAlbum(db.Model, TimestampMixin):
         return self.title
 
 class GalleryImage(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_gallery_image_album", "album_id", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     album_id = db.Column(db.Integer, db.ForeignKey("gallery_album.id"), nullable=False)
     image_url = db.Column(db.String(500), nullable=False)
@@ -168,6 +219,10 @@ class GalleryImage(db.Model, TimestampMixin):
     album = db.relationship("GalleryAlbum", backref=db.backref("images", lazy=True))
 
 class Alumni(db.Model, TimestampMixin):
+    __table_args__ = (
+        db.Index("ix_alumni_graduation_year", "graduation_year", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
     graduation_year = db.Column(db.String(10), nullable=False)
@@ -175,10 +230,15 @@ class Alumni(db.Model, TimestampMixin):
     organization = db.Column(db.String(255), default="", nullable=True)
     photo_url = db.Column(db.String(500), default="", nullable=True)
     profile_html = db.Column(db.Text, default="", nullable=False)
+    profile_rendered = db.Column(db.Text, default="", nullable=False)
+    profile_summary = db.Column(db.Text, default="", nullable=False)      # plain-text excerpt for lists
     is_featured = db.Column(db.Boolean, default=False, nullable=False)
 
 class HeroSlide(db.Model, TimestampMixin):
     __tablename__ = "hero_slides"
+    __table_args__ = (
+        db.Index("ix_hero_slides_active_order", "is_active", "order"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -193,4 +253,21 @@ class HeroSlide(db.Model, TimestampMixin):
     is_active = db.Column(db.Boolean, default=True, nullable=False)
 
 
+class ImageVariant(db.Model, TimestampMixin):
+    """A resized/re-encoded copy of an uploaded image (see app/images.py)."""
+    id = db.Column(db.Integer, primary_key=True)
+    source_url = db.Column(db.String(500), nullable=False, index=True)  # /static/... of the original
+    url = db.Column(db.String(500), nullable=False)
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    format = db.Column(db.String(10), default="webp", nullable=False)
+
 
+class MediaBlob(db.Model, TimestampMixin):
+    """One stored upload, named by its SHA-256 (see app/media.py)."""
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(64), unique=True, nullable=False)   # sha256 hex digest
+    ext = db.Column(db.String(10), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    refcount = db.Column(db.Integer, default=0, nullable=False)   # rows whose columns/rich text point at it
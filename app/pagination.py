@@ -0,0 +1,87 @@
+"""
+Keyset (cursor) pagination for public list pages.
+
+Instead of OFFSET, each page remembers the sort key of its last row and the
+next page asks for rows strictly after it:
+
+    WHERE (published_on, id) < (:last_published_on, :last_id)
+    ORDER BY published_on DESC, id DESC LIMIT :n
+
+With an index on the sort columns this costs the same on page 1 and on page
+1000, so response time and memory stay flat as the archive grows.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from flask import abort, current_app, request
+from sqlalchemy import tuple_
+
+
+class KeysetPage(NamedTuple):
+    items: list
+    per_page: int
+    cursor: Optional[str]        # cursor used to fetch this page (None = first page)
+    next_cursor: Optional[str]   # None when this is the last page
+
+
+def _encode(values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str, columns) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("cursor arity")
+
+        values = []
+        for col, v in zip(columns, raw):
+            py_type = col.type.python_type
+            if v is not None and py_type is datetime:
+                v = datetime.fromisoformat(v)
+            elif v is not None and py_type is date:
+                v = date.fromisoformat(v)
+            values.append(v)
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        abort(400, description="Invalid cursor")
+
+
+def requested_page_size(default=None, cap=None) -> int:
+    default = default or current_app.config.get("PUBLIC_PAGE_SIZE", 12)
+    cap = cap or current_app.config.get("PUBLIC_PAGE_SIZE_MAX", 48)
+    size = request.args.get("per_page", default, type=int)
+    return max(1, min(size, cap))
+
+
+def keyset_paginate(query, order_by, descending=False, cursor=None, per_page=None,
+                    row_factory=None) -> KeysetPage:
+    """
+    Return one page of `query` ordered by `order_by` (a list of columns, all
+    sorted in the same direction). Include a unique column (usually the
+    primary key) last so the order is total. The sort columns must be part
+    of the selected row. `row_factory` maps each row (e.g. Projection.row._make).
+    """
+    cursor = cursor if cursor is not None else request.args.get("cursor") or None
+    per_page = per_page or requested_page_size()
+
+    if cursor:
+        after = _decode(cursor, order_by)
+        key, last = tuple_(*order_by), tuple_(*after)
+        query = query.filter(key < last if descending else key > last)
+
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in order_by])
+    rows = query.limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = _encode([getattr(rows[-1], c.key) for c in order_by])
+
+    if row_factory is not None:
+        rows = [row_factory(r) for r in rows]
+    return KeysetPage(items=rows, per_page=per_page, cursor=cursor, next_cursor=next_cursor)
@@ -0,0 +1,63 @@
+"""
+One-time database provisioning, kept out of create_app().
+
+`flask init-db` creates missing tables, applies migrations, creates the
+search index (and fills it when it is empty) and the SiteSettings row, and seeds the first admin account
+(ADMIN_EMAIL / ADMIN_PASSWORD) when there is none. `flask create-admin` adds
+or resets an admin explicitly. Every step is idempotent, so re-running
+after a deploy is safe.
+
+Request-serving workers never call this; set AUTO_PROVISION=1 (run.py does)
+to do it at startup during local development.
+"""
+from flask import Flask
+
+from .extensions import db
+from .migrations import upgrade as upgrade_schema
+from .models import SiteSettings, User
+from .search import ensure_search_schema, index_is_empty, reindex_all
+
+
+def provision(app: Flask) -> dict:
+    """Bring the database up to date. Returns what was done."""
+    with app.app_context():
+        db.create_all()
+        ran = upgrade_schema()
+        ensure_search_schema()
+        # A new (or never filled) index: add the rows that already exist
+        indexed = reindex_all() if index_is_empty() else None
+
+        created_settings = False
+        if SiteSettings.query.first() is None:
+            db.session.add(SiteSettings(id=1))
+            created_settings = True
+
+        admin = None
+        if User.query.count() == 0:
+            admin = app.config.get("ADMIN_EMAIL", "admin@saveetha.edu.in")
+            _add_admin(admin, app.config.get("ADMIN_PASSWORD", "ChangeMe@123"))
+        db.session.commit()
+
+    return {"migrations": ran, "search_indexed": indexed, "created_settings": created_settings,
+            "seeded_admin": admin}
+
+
+def _add_admin(email: str, password: str) -> User:
+    user = User(email=email.strip().lower(), is_admin=True)
+    user.set_password(password)
+    db.session.add(user)
+    return user
+
+
+def create_admin(email: str, password: str) -> bool:
+    """Create an admin, or reset the password and admin flag of an existing user. True if created."""
+    email = email.strip().lower()
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        _add_admin(email, password)
+        db.session.commit()
+        return True
+    user.set_password(password)
+    user.is_admin = True
+    db.session.commit()
+    return False
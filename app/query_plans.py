@@ -0,0 +1,71 @@
+"""
+`flask db-explain`: print the query plan of every statement each public
+route runs. Caches are bypassed while capturing so the real queries show.
+"""
+from flask import current_app
+from sqlalchemy import event
+
+from .extensions import db
+from .models import Page, News, GalleryAlbum
+from . import site_cache, home_snapshot, images, fragment_cache
+
+
+def sample_urls() -> list:
+    urls = []
+    for rule in current_app.url_map.iter_rules():
+        if rule.endpoint.startswith("public.") and not rule.arguments and "GET" in rule.methods:
+            urls.append(rule.rule)
+
+    page = Page.query.filter_by(is_published=True).first()
+    news = News.query.filter_by(is_published=True).first()
+    album = GalleryAlbum.query.filter_by(is_published=True).first()
+    if page:
+        urls.append(f"/p/{page.slug}")
+    if news:
+        urls.append(f"/news/{news.slug}")
+    if album:
+        urls.append(f"/gallery/{album.id}")
+    urls.append("/search?q=intelligence")
+    return sorted(urls)
+
+
+def capture_statements(url: str) -> list:
+    """Run one GET with cold caches and return the (statement, parameters) it issued."""
+    seen = []
+    engine = db.engine
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("PRAGMA"):
+            seen.append((statement, parameters))
+
+    site_cache.invalidate()
+    home_snapshot.invalidate()
+    images.invalidate()
+    fragment_cache.clear()
+
+    enabled = current_app.config.get("RESPONSE_CACHE_ENABLED", True)
+    current_app.config["RESPONSE_CACHE_ENABLED"] = False
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        current_app.test_client().get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+        current_app.config["RESPONSE_CACHE_ENABLED"] = enabled
+    return seen
+
+
+def explain(statement: str, parameters) -> list:
+    prefix = "EXPLAIN QUERY PLAN " if db.engine.dialect.name == "sqlite" else "EXPLAIN "
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+    if db.engine.dialect.name == "sqlite":
+        # (id, parent, notused, detail)
+        return [r[-1] for r in rows]
+    return [r[0] for r in rows]
+
+
+def plan_report(urls=None):
+    """Yield (url, statement, plan_lines) for every captured query."""
+    for url in urls or sample_urls():
+        for statement, parameters in capture_statements(url):
+            yield url, statement, explain(statement, parameters)
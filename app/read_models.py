@@ -0,0 +1,63 @@
+"""
+Column-projected read models for list pages.
+
+List templates only need a handful of columns, but `Model.query.all()`
+pulls every column (including large HTML bodies) into identity-mapped ORM
+instances. A Projection selects just the listed columns and returns compact
+immutable namedtuples that are not attached to the session.
+"""
+from collections import namedtuple
+
+from .extensions import db
+from .models import (
+    News, Event, Faculty, Alumni, FundedProject, Newsletter, Program,
+    PlacementStat, MoU,
+)
+
+
+class Projection:
+    def __init__(self, name: str, *columns):
+        self.columns = columns
+        self.row = namedtuple(name, [c.key for c in columns])
+
+    def query(self):
+        """A Query over just these columns (filter/order/paginate as usual)."""
+        return db.session.query(*self.columns)
+
+    def wrap(self, rows) -> list:
+        return [self.row._make(r) for r in rows]
+
+    def all(self, query) -> list:
+        return self.wrap(query.all())
+
+
+# Lists show title/summary/date only: HTML bodies stay in the database
+# (faculty, events and alumni use the plain-text *_summary excerpts)
+NEWS_CARD = Projection("NewsCard", News.id, News.slug, News.title, News.summary,
+                       News.cover_image_url, News.published_on)
+
+EVENT_ROW = Projection("EventRow", Event.id, Event.title, Event.location, Event.starts_at,
+                       Event.registration_link, Event.description_summary)
+
+FACULTY_CARD = Projection("FacultyCard", Faculty.id, Faculty.name, Faculty.designation,
+                          Faculty.specialization, Faculty.email, Faculty.photo_url, Faculty.bio_summary)
+
+ALUMNI_CARD = Projection("AlumniCard", Alumni.id, Alumni.name, Alumni.graduation_year,
+                         Alumni.current_position, Alumni.organization, Alumni.photo_url,
+                         Alumni.profile_summary)
+
+PROJECT_CARD = Projection("ProjectCard", FundedProject.id, FundedProject.title, FundedProject.sponsor,
+                          FundedProject.amount, FundedProject.duration, FundedProject.pi,
+                          FundedProject.summary, FundedProject.created_at)
+
+NEWSLETTER_CARD = Projection("NewsletterCard", Newsletter.id, Newsletter.title, Newsletter.issue,
+                             Newsletter.published_on, Newsletter.pdf_url)
+
+PROGRAM_CARD = Projection("ProgramCard", Program.id, Program.level, Program.name, Program.duration,
+                          Program.eligibility, Program.overview_rendered)
+
+STAT_ROW = Projection("StatRow", PlacementStat.id, PlacementStat.label, PlacementStat.value)
+
+MOU_ROW = Projection("MoURow", MoU.id, MoU.partner_name, MoU.area, MoU.logo_url)
+
+ALBUM_CARD = namedtuple("AlbumCard", "id title category year cover_image_url image_count")
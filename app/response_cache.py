@@ -0,0 +1,120 @@
+"""
+Versioned full-response cache for public pages.
+
+A page is a function of the route, its arguments and the rows it reads, so
+the cache key includes a *content version* of every table the route
+declares (plus the chrome tables). The version comes from the shared
+registry in app/content_versions.py, so deciding between `304 Not
+Modified`, stored bytes and a fresh render costs no query and is the same
+answer on every worker. With CONTENT_VERSIONS_ENABLED off it falls back to
+one aggregate query over `max(updated_at)` and `count(*)`.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, request, session, make_response
+from sqlalchemy import func, select, union_all
+
+from . import content_versions
+from .extensions import db
+from .models import ImageVariant
+from .site_cache import CHROME_MODELS
+
+# Read by every page: header/nav/footer and responsive image srcsets
+ALWAYS_READ = CHROME_MODELS + (ImageVariant,)
+
+_lock = threading.Lock()
+_entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+def content_version(models):
+    """Return (token, last_modified) for the given models in a single query."""
+    parts = [
+        select(func.max(m.updated_at), func.count()).select_from(m.__table__)
+        for m in models
+    ]
+    rows = db.session.execute(union_all(*parts)).all()
+
+    last_modified = max((r[0] for r in rows if r[0] is not None), default=None)
+    token = "|".join(f"{r[0]}/{r[1]}" for r in rows)
+    return token, last_modified
+
+
+def _store(key, etag, body, mimetype):
+    max_entries = current_app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 512)
+    with _lock:
+        _entries[key] = (etag, body, mimetype)
+        _entries.move_to_end(key)
+        while len(_entries) > max_entries:
+            _entries.popitem(last=False)
+
+
+def _lookup(key, etag):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry[0] != etag:
+            return None
+        _entries.move_to_end(key)
+        return entry
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def cached_page(*models):
+    """
+    Cache a public GET view. `models` are the tables the view reads;
+    the ALWAYS_READ tables are included automatically.
+    """
+    tables = tuple(dict.fromkeys(ALWAYS_READ + models))
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Flash messages are per-user; never cache those renders
+            if (not current_app.config.get("RESPONSE_CACHE_ENABLED", True)
+                    or request.method not in ("GET", "HEAD")
+                    or session.get("_flashes")):
+                return view(*args, **kwargs)
+
+            key = (request.endpoint, tuple(sorted(kwargs.items())), request.query_string)
+            if content_versions.registry() is not None:
+                token, last_modified = content_versions.stamp(tables)
+            else:
+                token, last_modified = content_version(tables)
+            assets = current_app.extensions.get("assets", {}).get("version")
+            etag = hashlib.sha1(repr((key, token, assets)).encode("utf-8")).hexdigest()
+
+            def with_validators(resp):
+                resp.set_etag(etag)
+                if last_modified is not None:
+                    resp.last_modified = last_modified.replace(tzinfo=timezone.utc)
+                resp.cache_control.public = True
+                resp.cache_control.no_cache = True  # always revalidate
+                return resp
+
+            # Only the ETag decides 304s: max(updated_at) cannot see deletes
+            if request.if_none_match.contains(etag):
+                return with_validators(make_response("", 304))
+
+            entry = _lookup(key, etag)
+            if entry is not None:
+                resp = current_app.response_class(entry[1], mimetype=entry[2])
+                return with_validators(resp)
+
+            resp = make_response(view(*args, **kwargs))
+            if resp.status_code == 200 and not resp.direct_passthrough:
+                _store(key, etag, resp.get_data(), resp.mimetype)
+                return with_validators(resp)
+            return resp
+
+        # What the view itself reads (used by the static exporter)
+        wrapper.content_models = models
+        return wrapper
+
+    return decorator
@@ -0,0 +1,446 @@
+"""
+Write-time processing of CMS rich text.
+
+Editors paste HTML (often with 4000px photos) into body/bio/description
+fields. Instead of sending that through `|safe` on every request, each
+source column has a *rendered* sibling computed when the row is saved:
+
+* the HTML is sanitised against an allowlist (scripts, event handlers,
+  javascript: URLs and unknown tags are removed; unclosed tags are closed);
+* every <img> gets loading="lazy", decoding="async" and width/height (read
+  from the file header, so the browser can reserve space);
+* local images that have responsive variants (app/images.py) are pointed at
+  the largest variant, with a srcset of all of them, instead of the original.
+
+Columns in SUMMARIES also get a plain-text excerpt, so list pages never
+select the full body.
+
+URL columns such as Page.header_image_url are normalised to "/static/..."
+at the same time. Rendering happens in mapper before_insert/before_update
+hooks (admin saves, seed scripts), in `flask import-content`, and in bulk via
+`render_all()` (migration 0003, `flask render-content`).
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from flask import current_app, has_app_context
+from PIL import Image
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.orm import attributes
+
+from . import content_versions
+from .extensions import db
+from .images import _static_path, ensure_variants
+from .models import Alumni, Event, Faculty, ImageVariant, News, Page, Program
+from .search import html_to_text
+
+# model -> {source column: rendered column}
+RENDERED = {
+    Page: {"body_html": "body_rendered"},
+    News: {"body_html": "body_rendered"},
+    Faculty: {"bio_html": "bio_rendered"},
+    Event: {"description_html": "description_rendered"},
+    Program: {"overview_html": "overview_rendered"},
+    Alumni: {"profile_html": "profile_rendered"},
+}
+
+# model -> {source column: plain-text excerpt column} for list pages that
+# show a short blurb instead of the whole body
+SUMMARIES = {
+    Faculty: {"bio_html": "bio_summary"},
+    Event: {"description_html": "description_summary"},
+    Alumni: {"profile_html": "profile_summary"},
+}
+SUMMARY_CHARS = 300
+
+# model -> columns holding an image path that are stored as "/static/..." URLs
+STATIC_URL_FIELDS = {
+    Page: ("header_image_url",),
+}
+
+ALLOWED_TAGS = {
+    "a", "abbr", "address", "article", "aside", "b", "blockquote", "br", "caption", "cite", "code",
+    "col", "colgroup", "dd", "del", "details", "div", "dl", "dt", "em", "figcaption", "figure",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "i", "iframe", "img", "ins", "kbd",
+    "li", "mark", "nav", "ol", "p", "pre", "q", "s", "section", "small", "span", "strong", "sub",
+    "summary", "sup", "table", "tbody", "td", "tfoot", "th", "thead", "time", "tr", "u", "ul",
+}
+VOID_TAGS = {"br", "col", "hr", "img"}
+# Removed together with everything inside them
+DROP_CONTENT = {"script", "style", "template", "noscript", "object", "embed", "applet",
+                "svg", "math", "head", "title", "textarea", "select"}
+
+GLOBAL_ATTRS = {"class", "id", "title", "lang", "dir", "style", "role"}
+TAG_ATTRS = {
+    "a": {"href", "target", "rel", "name"},
+    "img": {"src", "alt", "width", "height", "srcset", "sizes"},
+    "iframe": {"src", "width", "height", "allow", "allowfullscreen", "frameborder", "title"},
+    "td": {"colspan", "rowspan"},
+    "th": {"colspan", "rowspan", "scope"},
+    "col": {"span"},
+    "colgroup": {"span"},
+    "ol": {"start", "type"},
+    "blockquote": {"cite"},
+    "q": {"cite"},
+    "time": {"datetime"},
+    "details": {"open"},
+}
+URL_ATTRS = {"href", "src", "cite"}
+SAFE_SCHEMES = {"", "http", "https", "mailto", "tel"}
+DEFAULT_IFRAME_HOSTS = ("www.youtube.com", "www.youtube-nocookie.com", "player.vimeo.com", "www.google.com")
+
+_CONTROL = re.compile(r"[\x00-\x20\x7f]+")
+# Inline style: allowlisted properties with plain values only. Backslashes (CSS
+# escapes), comments and any function call other than colour functions are
+# refused, so nothing like u\72l(...) or expression(...) survives.
+CSS_PROPERTIES = {
+    "color", "background-color", "text-align", "text-decoration", "text-transform", "text-indent",
+    "font-weight", "font-style", "font-size", "line-height", "letter-spacing", "white-space",
+    "vertical-align", "float", "clear", "width", "max-width", "min-width", "height",
+    "margin", "margin-top", "margin-right", "margin-bottom", "margin-left",
+    "padding", "padding-top", "padding-right", "padding-bottom", "padding-left",
+    "border", "border-top", "border-right", "border-bottom", "border-left",
+    "border-color", "border-style", "border-width", "border-collapse", "list-style-type",
+}
+_CSS_VALUE = re.compile(r"^(?:[#\w\s.,%+-]|(?:rgba?|hsla?)\([\d\s.,%]*\))*$", re.I)
+_DATA_IMAGE = re.compile(r"data:image/(png|jpe?g|gif|webp);", re.I)
+
+
+def _iframe_hosts():
+    if has_app_context():
+        return current_app.config.get("RICH_TEXT_IFRAME_HOSTS", DEFAULT_IFRAME_HOSTS)
+    return DEFAULT_IFRAME_HOSTS
+
+
+def _safe_url(value: str, tag: str):
+    value = value.strip()
+    probe = _CONTROL.sub("", value)
+    if tag == "img" and _DATA_IMAGE.match(probe):
+        return value
+    scheme = urlsplit(probe).scheme.lower() if ":" in probe.split("/", 1)[0] else ""
+    if scheme not in SAFE_SCHEMES:
+        return None
+    if tag == "iframe":
+        parts = urlsplit(probe)
+        if parts.scheme != "https" or parts.hostname not in _iframe_hosts():
+            return None
+    return value
+
+
+def _clean_style(value: str) -> str:
+    """Keep only allowlisted `property: value` declarations with plain values."""
+    kept = []
+    for declaration in value.split(";"):
+        prop, sep, val = declaration.partition(":")
+        prop, val = prop.strip().lower(), val.strip()
+        if sep and prop in CSS_PROPERTIES and val and _CSS_VALUE.match(val):
+            kept.append(f"{prop}: {val}")
+    return "; ".join(kept)
+
+
+def normalize_static_url(value):
+    """'images/x.jpg' / 'images\\x.jpg' -> '/static/images/x.jpg'; absolute and remote URLs unchanged."""
+    if not value:
+        return value
+    v = str(value).strip().replace("\\", "/")
+    if not v or v.startswith(("/static/", "http://", "https://", "//", "data:")):
+        return v
+    return "/static/" + v.lstrip("/")
+
+
+# --- images ----------------------------------------------------------------
+
+def _intrinsic_size(src: str):
+    path = _static_path(src) if has_app_context() else None
+    if path is None:
+        return None
+    try:
+        with Image.open(path) as im:  # reads the header only
+            w, h = im.size
+            if im.getexif().get(0x0112) in (5, 6, 7, 8):  # EXIF rotated by 90°
+                w, h = h, w
+            return w, h
+    except (OSError, ValueError):
+        return None
+
+
+def _int(value):
+    try:
+        return int(str(value).strip().rstrip("px"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _process_img(attrs: dict, variants_for) -> dict:
+    src = attrs.get("src")
+    if not src:
+        return attrs
+    width, height = _int(attrs.get("width")), _int(attrs.get("height"))
+
+    natural = None
+    variants = variants_for(src) if variants_for else ()
+    if variants and "srcset" not in attrs:
+        best = variants[-1]
+        attrs["src"] = best[0]
+        attrs["srcset"] = ", ".join(f"{url} {w}w" for url, w, _h in variants)
+        attrs.setdefault("sizes", f"(max-width: {width}px) 100vw, {width}px" if width else "100vw")
+        natural = best[1], best[2]
+    else:
+        natural = _intrinsic_size(src)
+
+    if natural:
+        nw, nh = natural
+        if width and not height:
+            height = round(width * nh / nw)
+        elif height and not width:
+            width = round(height * nw / nh)
+        elif not width and not height:
+            width, height = nw, nh
+    if width and height:
+        attrs["width"], attrs["height"] = str(width), str(height)
+
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+    return attrs
+
+
+# --- sanitiser -------------------------------------------------------------
+
+class _Renderer(HTMLParser):
+    def __init__(self, variants_for=None):
+        super().__init__(convert_charrefs=True)
+        self.variants_for = variants_for
+        self.out = []
+        self.open = []      # allowed tags currently open
+        self._drop = 0      # depth inside DROP_CONTENT elements
+        self.images = []    # src of every <img> kept (original URLs)
+
+    def _attrs(self, tag, attrs) -> dict:
+        allowed = GLOBAL_ATTRS | TAG_ATTRS.get(tag, set())
+        clean = {}
+        for name, value in attrs:
+            name = name.lower()
+            if (name not in allowed and not name.startswith("aria-")) or name.startswith("on"):
+                continue
+            value = "" if value is None else value
+            if name in URL_ATTRS:
+                value = _safe_url(value, tag)
+                if value is None:
+                    continue
+            elif name == "style":
+                value = _clean_style(value)
+                if not value:
+                    continue
+            elif name == "srcset" and any(_safe_url(part.split()[0], tag) is None
+                                          for part in value.split(",") if part.strip()):
+                continue
+            clean[name] = value
+        return clean
+
+    def _emit_start(self, tag, attrs):
+        attrs = self._attrs(tag, attrs)
+        if tag == "iframe" and "src" not in attrs:
+            return False
+        if tag == "img":
+            if "src" not in attrs:
+                return False
+            self.images.append(attrs["src"])
+            attrs = _process_img(attrs, self.variants_for)
+        elif tag == "iframe":
+            attrs.setdefault("loading", "lazy")
+        elif tag == "a" and attrs.get("target") == "_blank":
+            attrs["rel"] = "noopener noreferrer"
+        rendered = "".join(f' {k}="{escape(v, quote=True)}"' for k, v in attrs.items())
+        self.out.append(f"<{tag}{rendered}>")
+        return True
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT:
+            self._drop += 1
+            return
+        if self._drop or tag not in ALLOWED_TAGS:
+            return
+        if self._emit_start(tag, attrs) and tag not in VOID_TAGS:
+            self.open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in DROP_CONTENT or self._drop or tag not in ALLOWED_TAGS:
+            return
+        if self._emit_start(tag, attrs) and tag not in VOID_TAGS:
+            self.out.append(f"</{tag}>")
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT:
+            self._drop = max(0, self._drop - 1)
+            return
+        if self._drop or tag not in self.open:
+            return
+        while self.open:
+            top = self.open.pop()
+            self.out.append(f"</{top}>")
+            if top == tag:
+                break
+
+    def handle_data(self, data):
+        if not self._drop:
+            self.out.append(escape(data, quote=False))
+
+    def result(self) -> str:
+        self.close()
+        while self.open:
+            self.out.append(f"</{self.open.pop()}>")
+        return "".join(self.out)
+
+
+def render_html(html, variants_for=None) -> str:
+    """Sanitised, image-optimised HTML for a rendered column."""
+    if not html:
+        return ""
+    renderer = _Renderer(variants_for)
+    renderer.feed(str(html))
+    return renderer.result()
+
+
+def image_sources(html) -> list:
+    """Local image URLs referenced by <img> in `html`."""
+    if not html:
+        return []
+    renderer = _Renderer()
+    renderer.feed(str(html))
+    renderer.result()
+    return [src for src in renderer.images if not src.startswith(("http://", "https://", "//", "data:"))]
+
+
+def variant_lookup(connection):
+    """url -> ((variant url, width, height), ...) by ascending width, memoised per call site."""
+    seen = {}
+    table = ImageVariant.__table__
+
+    def variants_for(url):
+        if url not in seen:
+            rows = connection.execute(
+                select(table.c.url, table.c.width, table.c.height)
+                .where(table.c.source_url == url)
+                .order_by(table.c.width.asc())).all()
+            seen[url] = tuple(tuple(r) for r in rows)
+        return seen[url]
+
+    return variants_for
+
+
+# --- applying it to rows ------------------------------------------------------
+
+def process_values(model, values: dict, variants_for, provided=None) -> dict:
+    """
+    Fill the rendered columns (and normalise URL columns) in a column dict.
+    `provided` limits the work to sources present, as in a partial import.
+    """
+    for field in STATIC_URL_FIELDS.get(model, ()):
+        if field in values:
+            values[field] = normalize_static_url(values[field])
+    for source, rendered in RENDERED.get(model, {}).items():
+        if provided is None or source in provided:
+            values[rendered] = render_html(values.get(source), variants_for)
+    for source, summary in SUMMARIES.get(model, {}).items():
+        if provided is None or source in provided:
+            values[summary] = summarize(values.get(source))
+    return values
+
+
+def summarize(html) -> str:
+    """Plain-text excerpt of `html`, cut at a word boundary."""
+    plain = html_to_text(html)
+    if len(plain) <= SUMMARY_CHARS:
+        return plain
+    return plain[:SUMMARY_CHARS].rsplit(" ", 1)[0].rstrip(".,;:") + "…"
+
+
+def derived_columns(model) -> dict:
+    """{rendered or summary column: source column} for `model`."""
+    derived = {rendered: source for source, rendered in RENDERED.get(model, {}).items()}
+    derived.update({summary: source for source, summary in SUMMARIES.get(model, {}).items()})
+    return derived
+
+
+def _before_save(mapper, connection, target):
+    model = mapper.class_
+    for field in STATIC_URL_FIELDS.get(model, ()):
+        value = getattr(target, field)
+        normalized = normalize_static_url(value)
+        if normalized != value:
+            setattr(target, field, normalized)
+
+    variants_for = None
+    for source, rendered in RENDERED.get(model, {}).items():
+        changed = attributes.get_history(target, source).has_changes()
+        if changed or getattr(target, rendered) is None:
+            variants_for = variants_for or variant_lookup(connection)
+            setattr(target, rendered, render_html(getattr(target, source), variants_for))
+    for source, summary in SUMMARIES.get(model, {}).items():
+        if attributes.get_history(target, source).has_changes() or getattr(target, summary) is None:
+            setattr(target, summary, summarize(getattr(target, source)))
+
+
+def register_rich_text_events() -> None:
+    for model in set(RENDERED) | set(STATIC_URL_FIELDS):
+        for name in ("before_insert", "before_update"):
+            if not event.contains(model, name, _before_save):
+                event.listen(model, name, _before_save)
+
+
+def ensure_embedded_variants(model) -> bool:
+    """
+    Generate variants for local images inside the rich-text fields of `model`
+    (called after an admin save). When any were made, the rendered columns are
+    marked for re-rendering on the next commit. Returns True if so.
+    """
+    sources = RENDERED.get(type(model), {})
+    made = False
+    for source in sources:
+        for src in dict.fromkeys(image_sources(getattr(model, source, None))):
+            made = ensure_variants(src) or made
+    if made:
+        db.session.flush()   # variant rows first, so the re-render sees them
+        for source in sources:
+            attributes.flag_modified(model, source)
+    return made
+
+
+def render_all(models=None, batch_size=500) -> int:
+    """
+    Recompute every rendered column (Core updates; updated_at is left alone).
+    The tables' content versions are bumped when the caller commits. Returns rows.
+    """
+    connection = db.session.connection()
+    variants_for = variant_lookup(connection)
+    total = 0
+    for model in models or list(RENDERED):
+        table = model.__table__
+        pairs = RENDERED[model]
+        urls = STATIC_URL_FIELDS.get(model, ())
+        sources = list(pairs) + list(urls)
+
+        written = list(pairs.values()) + list(SUMMARIES.get(model, {}).values()) + list(urls)
+        stmt = (update(table).where(table.c.id == bindparam("_id"))
+                .values({c: bindparam(f"_{c}") for c in written + ["updated_at"]}))
+        query = (select(table.c.id, table.c.updated_at, *(table.c[c] for c in sources))
+                 .order_by(table.c.id).limit(batch_size))
+        last_id = None
+        while True:
+            page = query if last_id is None else query.where(table.c.id > last_id)
+            rows = connection.execute(page).all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                values = process_values(model, dict(row._mapping), variants_for)
+                params.append({"_id": row.id, "_updated_at": row.updated_at,
+                               **{f"_{c}": values[c] for c in written}})
+            connection.execute(stmt, params)
+            total += len(params)
+            last_id = rows[-1].id
+        # Core updates on the raw connection skip the session hooks
+        content_versions.mark_changed(db.session, model)
+    return total
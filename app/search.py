@@ -0,0 +1,263 @@
+"""
+Site search backed by a real inverted index.
+
+* SQLite: an FTS5 virtual table (`search_index`) ranked with bm25().
+* Postgres: a `search_index` table with a weighted tsvector + GIN index.
+
+One row per searchable record. Rows are written in the same transaction as
+the content change by SQLAlchemy mapper events, so the index never needs a
+full rebuild after an admin edit (`flask search-reindex` exists for
+backfills and imports).
+"""
+import re
+from html import unescape
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+from markupsafe import Markup, escape
+from sqlalchemy import event, text
+
+from .extensions import db
+from .models import Page, News, Event, Faculty, FundedProject
+
+HIT_START, HIT_END = "\x02", "\x03"
+
+
+class SearchSource(NamedTuple):
+    kind: str
+    title: str          # column used as the result title
+    body: tuple         # columns concatenated into the searchable body
+    is_visible: object  # row -> bool (unpublished rows are kept out of the index)
+    url: object         # row -> public URL
+
+
+SOURCES = {
+    Page: SearchSource("page", "title", ("header_subtitle", "body_html"),
+                       lambda r: r.is_published, lambda r: f"/p/{r.slug}"),
+    News: SearchSource("news", "title", ("summary", "body_html"),
+                       lambda r: r.is_published, lambda r: f"/news/{r.slug}"),
+    Event: SearchSource("event", "title", ("location", "description_html"),
+                        lambda r: r.is_published, lambda r: "/events"),
+    Faculty: SearchSource("faculty", "name", ("designation", "specialization", "bio_html"),
+                          lambda r: r.is_published, lambda r: "/faculty"),
+    FundedProject: SearchSource("project", "title", ("sponsor", "pi", "summary"),
+                                lambda r: r.is_published, lambda r: "/research"),
+}
+
+# SQLite: each row's FTS5 rowid is KIND_CODES[kind] << 40 | ref_id, so a
+# record is found by rowid (kind and ref_id are UNINDEXED columns, and
+# filtering on them would scan the whole index)
+KIND_CODES = {"page": 1, "news": 2, "event": 3, "faculty": 4, "project": 5}
+_ROWID_SHIFT = 40
+
+
+def _rowid(kind: str, ref_id: int) -> int:
+    return (KIND_CODES[kind] << _ROWID_SHIFT) | ref_id
+
+
+KIND_LABELS = {"page": "Page", "news": "News", "event": "Event",
+               "faculty": "Faculty", "project": "Funded Project"}
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    ref_id: int
+    url: str
+    title: str
+    snippet: Markup
+
+
+# --- HTML -> text ---------------------------------------------------------
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(value) -> str:
+    if not value:
+        return ""
+    parser = _TextExtractor()
+    parser.feed(str(value))
+    parser.close()
+    return re.sub(r"\s+", " ", unescape(" ".join(parser.parts))).strip()
+
+
+# --- schema ---------------------------------------------------------------
+
+def ensure_search_schema() -> None:
+    """Create the index for the current dialect (idempotent)."""
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_index ("
+            " kind VARCHAR(20) NOT NULL, ref_id INTEGER NOT NULL, url VARCHAR(500) NOT NULL,"
+            " title TEXT NOT NULL, body TEXT NOT NULL, document TSVECTOR NOT NULL,"
+            " PRIMARY KEY (kind, ref_id))"))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_search_index_document ON search_index USING GIN (document)"))
+    else:
+        db.session.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            " kind UNINDEXED, ref_id UNINDEXED, url UNINDEXED, title, body,"
+            " tokenize = 'porter unicode61')"))
+    db.session.commit()
+
+
+def index_is_empty() -> bool:
+    return db.session.execute(text("SELECT 1 FROM search_index LIMIT 1")).first() is None
+
+
+# --- writes ---------------------------------------------------------------
+
+def _delete(connection, kind, ref_id):
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("DELETE FROM search_index WHERE kind = :kind AND ref_id = :ref_id"),
+                           {"kind": kind, "ref_id": ref_id})
+    else:
+        connection.execute(text("DELETE FROM search_index WHERE rowid = :rowid"),
+                           {"rowid": _rowid(kind, ref_id)})
+
+
+def _delete_kind(connection, kind):
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("DELETE FROM search_index WHERE kind = :kind"), {"kind": kind})
+    else:
+        connection.execute(text("DELETE FROM search_index WHERE rowid BETWEEN :lo AND :hi"),
+                           {"lo": _rowid(kind, 0), "hi": _rowid(kind, (1 << _ROWID_SHIFT) - 1)})
+
+
+def _document(row):
+    """Index parameters for one row, or None when it isn't publicly visible."""
+    source = SOURCES[type(row)]
+    if not source.is_visible(row):
+        return None
+    return {
+        "kind": source.kind,
+        "ref_id": row.id,
+        "url": source.url(row),
+        "title": getattr(row, source.title) or "",
+        "body": " ".join(html_to_text(getattr(row, col)) for col in source.body),
+    }
+
+
+def _insert(connection, documents) -> None:
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "INSERT INTO search_index (kind, ref_id, url, title, body, document) VALUES"
+            " (:kind, :ref_id, :url, :title, :body,"
+            "  setweight(to_tsvector('english', :title), 'A') ||"
+            "  setweight(to_tsvector('english', :body), 'B'))"), documents)
+    else:
+        if isinstance(documents, dict):
+            documents = [documents]
+        connection.execute(text(
+            "INSERT INTO search_index (rowid, kind, ref_id, url, title, body)"
+            " VALUES (:rowid, :kind, :ref_id, :url, :title, :body)"),
+            [{**d, "rowid": _rowid(d["kind"], d["ref_id"])} for d in documents])
+
+
+def index_row(connection, row) -> None:
+    _delete(connection, SOURCES[type(row)].kind, row.id)
+    document = _document(row)
+    if document:
+        _insert(connection, document)
+
+
+def reindex_all(models=None) -> int:
+    """Rebuild the index (after imports / first deploy), optionally only for some models."""
+    connection = db.session.connection()
+    if models is None:
+        models = list(SOURCES)
+        connection.execute(text("DELETE FROM search_index"))
+    else:
+        models = [m for m in models if m in SOURCES]
+        for model in models:
+            _delete_kind(connection, SOURCES[model].kind)
+    # Everything was deleted above, so insert in batches without per-row deletes.
+    n = 0
+    for model in models:
+        batch = []
+        for row in model.query.yield_per(500):
+            document = _document(row)
+            if document:
+                batch.append(document)
+            if len(batch) >= 500:
+                _insert(connection, batch)
+                n += len(batch)
+                batch = []
+        if batch:
+            _insert(connection, batch)
+            n += len(batch)
+    db.session.commit()
+    return n
+
+
+def _after_save(mapper, connection, target):
+    index_row(connection, target)
+
+
+def _after_delete(mapper, connection, target):
+    _delete(connection, SOURCES[type(target)].kind, target.id)
+
+
+def register_search_events() -> None:
+    for model in SOURCES:
+        if not event.contains(model, "after_insert", _after_save):
+            event.listen(model, "after_insert", _after_save)
+            event.listen(model, "after_update", _after_save)
+            event.listen(model, "after_delete", _after_delete)
+
+
+# --- reads ----------------------------------------------------------------
+
+def _terms(q: str) -> list:
+    return re.findall(r"\w+", q.lower())[:8]
+
+
+def _highlight(raw: str) -> Markup:
+    """Escape the snippet, then turn the hit markers into <mark>."""
+    safe = str(escape(raw or ""))
+    return Markup(safe.replace(HIT_START, "<mark>").replace(HIT_END, "</mark>"))
+
+
+def search(q: str, limit: int = 10, offset: int = 0) -> list:
+    terms = _terms(q)
+    if not terms:
+        return []
+
+    params = {"limit": limit, "offset": offset}
+    if db.engine.dialect.name == "postgresql":
+        params["q"] = " & ".join(f"{t}:*" for t in terms)
+        sql = (
+            "SELECT kind, ref_id, url, title,"
+            " ts_headline('english', body, to_tsquery('english', :q),"
+            "   'StartSel=\x02, StopSel=\x03, MaxWords=30, MinWords=10, MaxFragments=2') AS snippet"
+            " FROM search_index WHERE document @@ to_tsquery('english', :q)"
+            " ORDER BY ts_rank_cd(document, to_tsquery('english', :q)) DESC, kind, ref_id"
+            " LIMIT :limit OFFSET :offset")
+    else:
+        # Quoted prefix terms, implicitly ANDed: user input never reaches FTS syntax
+        params["q"] = " ".join(f'"{t}"*' for t in terms)
+        sql = (
+            "SELECT kind, ref_id, url, title,"
+            " snippet(search_index, 4, char(2), char(3), '…', 24) AS snippet"
+            " FROM search_index WHERE search_index MATCH :q"
+            " ORDER BY bm25(search_index, 0, 0, 0, 10.0, 1.0)"
+            " LIMIT :limit OFFSET :offset")
+
+    rows = db.session.execute(text(sql), params).all()
+    return [SearchHit(r.kind, int(r.ref_id), r.url, r.title, _highlight(r.snippet)) for r in rows]
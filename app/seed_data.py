@@ -1,5 +1,4 @@
 import os
-import sqlite3
 from sqlalchemy import text
 from .extensions import db
 
@@ -14,23 +13,29 @@ TABLES_TO_CHECK = [
     "event",
 ]
 
-def _sqlite_file_from_uri(uri: str):
-    # sqlite:///instance/site.db  -> instance/site.db
-    # sqlite:////abs/path/site.db -> /abs/path/site.db
-    if not uri.startswith("sqlite:"):
-        return None
-    if uri.startswith("sqlite:////"):
-        return uri.replace("sqlite:////", "/")
-    return uri.replace("sqlite:///", "")
+SEED_SUFFIXES = (".csv", ".jsonl", ".json", ".csv.gz", ".jsonl.gz", ".json.gz")
+
+
+def _seed_files(seed_dir):
+    # seed/<kind>.<ext>, e.g. seed/news.csv or seed/pages.json (kinds as in IMPORTABLE)
+    from .content_import import IMPORTABLE
+
+    for name in sorted(os.listdir(seed_dir)):
+        for suffix in SEED_SUFFIXES:
+            if name.endswith(suffix) and name[:-len(suffix)] in IMPORTABLE:
+                yield name[:-len(suffix)], os.path.join(seed_dir, name)
+
 
 def seed_if_empty(app):
     """
-    Seeds SQLite DB from seed/seed.sql if DB is empty.
+    Seeds the DB from the files in seed/ if it is empty (any dialect).
     Runs only when env var SEED_DEMO=1.
     """
     if os.getenv("SEED_DEMO", "0") != "1":
         return
 
+    from .content_import import import_content
+
     with app.app_context():
         db.create_all()
 
@@ -42,44 +47,13 @@ def seed_if_empty(app):
                     print(f"Seed skip: '{t}' already has {n} rows")
                     return
             except Exception:
-                pass
-
-        seed_path = os.path.abspath(os.path.join(app.root_path, "..", "seed", "seed.sql"))
-        if not os.path.exists(seed_path):
-            print("Seed file missing:", seed_path)
-            return
-
-        uri = app.config.get("SQLALCHEMY_DATABASE_URI", "")
-        db_path = _sqlite_file_from_uri(uri)
-        if not db_path:
-            print("Seed: non-sqlite DB or invalid URI, skipping.")
-            return
-
-        # Make relative sqlite path relative to project root
-        if not os.path.isabs(db_path):
-            project_root = os.path.abspath(os.path.join(app.root_path, ".."))
-            db_path = os.path.join(project_root, db_path)
-
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-
-        sql = open(seed_path, "r", encoding="utf-8").read()
-
-        # Only INSERT statements to avoid schema conflicts
-        inserts = []
-        for line in sql.splitlines():
-            s = line.strip()
-            if s.upper().startswith("INSERT INTO"):
-                inserts.append(line)
-        insert_sql = "\n".join(inserts)
+                db.session.rollback()
 
-        if not insert_sql.strip():
-            print("Seed: no INSERT statements found.")
+        seed_dir = os.path.abspath(os.path.join(app.root_path, "..", "seed"))
+        if not os.path.isdir(seed_dir):
+            print("Seed folder missing:", seed_dir)
             return
 
-        conn = sqlite3.connect(db_path)
-        try:
-            conn.execute("PRAGMA foreign_keys=OFF;")
-            conn.executescript("BEGIN;\n" + insert_sql + "\nCOMMIT;")
-            print("✅ Seeded demo data into:", db_path)
-        finally:
-            conn.close()
+        for kind, path in _seed_files(seed_dir):
+            result = import_content(kind, path)
+            print(f"Seeded {kind}: {result['written']} row(s)")
@@ -0,0 +1,7 @@
+from blinker import Namespace
+
+_signals = Namespace()
+
+# Sent by the CMS after a row was created, edited or deleted and committed.
+# sender: the model class, kwargs: model=<instance>
+content_changed = _signals.signal("content-changed")
@@ -0,0 +1,85 @@
+"""
+Process-local cache for the site "chrome" (header, nav, footer).
+
+Every public page needs SiteSettings and the Page.show_in_menu entries.
+Both change only when an editor saves in the CMS, so we keep an immutable
+snapshot in memory and rebuild it when `content_changed` fires for one of
+the contributing models, or when their shared content version moved
+because another worker saved (app/content_versions.py).
+"""
+import threading
+from collections import namedtuple
+from typing import NamedTuple, Optional
+
+from . import content_versions
+from .extensions import db
+from .models import SiteSettings, Page
+from .signals import content_changed
+
+SettingsSnapshot = namedtuple(
+    "SettingsSnapshot", [c.name for c in SiteSettings.__table__.columns]
+)
+MenuPage = namedtuple("MenuPage", "slug title")
+
+
+class Chrome(NamedTuple):
+    settings: SettingsSnapshot
+    menu_pages: tuple
+
+
+# Models whose rows end up in the snapshot
+CHROME_MODELS = (SiteSettings, Page)
+
+_lock = threading.Lock()
+_chrome: Optional[tuple] = None   # (content versions it was built at, Chrome)
+
+
+def _column_default(col):
+    default = col.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    return default.arg
+
+
+def _settings_snapshot() -> SettingsSnapshot:
+    row = SiteSettings.query.order_by(SiteSettings.id.asc()).first()
+    if row is None:
+        # Cold database: render with column defaults instead of writing in a GET
+        return SettingsSnapshot(*(_column_default(c) for c in SiteSettings.__table__.columns))
+    return SettingsSnapshot(*(getattr(row, c) for c in SettingsSnapshot._fields))
+
+
+def _menu_pages() -> tuple:
+    rows = (db.session.query(Page.slug, Page.title)
+            .filter(Page.is_published.is_(True), Page.show_in_menu.is_(True))
+            .order_by(Page.id.asc())
+            .all())
+    return tuple(MenuPage(slug, title) for slug, title in rows)
+
+
+def get_chrome() -> Chrome:
+    global _chrome
+    # Read the versions before the rows: a save that lands mid-build leaves an older stamp
+    current = content_versions.versions(CHROME_MODELS)
+    entry = _chrome
+    if entry is not None and entry[0] == current:
+        return entry[1]
+
+    with _lock:
+        if _chrome is None or _chrome[0] != current:
+            _chrome = (current, Chrome(settings=_settings_snapshot(), menu_pages=_menu_pages()))
+        return _chrome[1]
+
+
+def invalidate() -> None:
+    global _chrome
+    with _lock:
+        _chrome = None
+
+
+@content_changed.connect
+def _on_content_changed(sender, **kwargs):
+    if sender in CHROME_MODELS:
+        invalidate()
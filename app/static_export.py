@@ -0,0 +1,233 @@
+"""
+Static pre-render of the public site (`flask export-static`).
+
+Every public URL is rendered through the normal Flask stack into
+<out>/<path>/index.html, alongside a routes.json map, so Nginx can serve the
+site directly:
+
+    location / {
+        # try_files ignores the query string: send ?cursor=, ?q=... to Flask
+        error_page 418 = @flask;
+        if ($args) { return 418; }
+        try_files $uri $uri/index.html @flask;
+    }
+    location @flask { proxy_pass http://127.0.0.1:8000; }
+
+The exported files only hold the query-free page, so requests with a query
+string (pagination cursors, /search?q=) must reach Flask as above.
+
+Rebuilds are incremental: only pages whose source rows changed since the
+previous export are rendered again, spread over a process pool.
+"""
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import NamedTuple
+
+from flask import current_app
+from sqlalchemy import func
+
+from .extensions import db
+from .models import SiteSettings, Page, News, GalleryAlbum, GalleryImage, ImageVariant
+from .site_cache import get_chrome
+
+STATE_FILE = ".export-state.json"
+ROUTE_MAP = "routes.json"
+
+# Changing any of these changes every page (header/nav/footer, srcsets)
+GLOBAL_MODELS = (SiteSettings, ImageVariant)
+
+
+class DetailRoute(NamedTuple):
+    endpoint: str
+    model: type
+    url: object       # row -> URL
+    visible: object   # model -> filter expression for rows that have a public page
+    related: dict     # other model -> its column pointing at model.id
+
+
+DETAIL_ROUTES = (
+    DetailRoute("public.page_by_slug", Page, lambda r: f"/p/{r.slug}",
+                lambda m: m.is_published.is_(True), {}),
+    DetailRoute("public.news_detail", News, lambda r: f"/news/{r.slug}",
+                lambda m: m.is_published.is_(True), {}),
+    DetailRoute("public.gallery_album", GalleryAlbum, lambda r: f"/gallery/{r.id}",
+                lambda m: m.is_published.is_(True), {GalleryImage: GalleryImage.album_id}),
+)
+
+
+def _list_routes():
+    """Argument-free public GET routes and the models they read."""
+    routes = {}
+    for rule in current_app.url_map.iter_rules():
+        if not rule.endpoint.startswith("public.") or rule.arguments or "GET" not in rule.methods:
+            continue
+        view = current_app.view_functions[rule.endpoint]
+        if rule.endpoint == "public.search":
+            continue  # needs ?q=
+        routes[rule.rule] = getattr(view, "content_models", None)
+    return routes
+
+
+def _all_models():
+    models = set(GLOBAL_MODELS)
+    for models_read in _list_routes().values():
+        models.update(models_read or ())
+    for d in DETAIL_ROUTES:
+        models.add(d.model)
+        models.update(d.related)
+    return sorted(models, key=lambda m: m.__tablename__)
+
+
+def output_path(url: str) -> str:
+    return "index.html" if url == "/" else url.strip("/") + "/index.html"
+
+
+def _model_state():
+    return {m.__tablename__: db.session.query(func.count()).select_from(m).scalar() for m in _all_models()}
+
+
+def _changed_ids(model, since):
+    return {i for (i,) in db.session.query(model.id).filter(model.updated_at > since)}
+
+
+def plan(previous: dict, full: bool = False):
+    """Return (all_urls, urls_to_render) for the current database."""
+    counts = _model_state()
+    menu = [list(p) for p in get_chrome().menu_pages]
+    assets = current_app.extensions.get("assets", {}).get("version")
+
+    detail_urls = {}
+    for d in DETAIL_ROUTES:
+        for row in d.model.query.filter(d.visible(d.model)):
+            detail_urls[d.url(row)] = (d, row.id)
+    list_routes = _list_routes()
+    all_urls = sorted(set(list_routes) | set(detail_urls))
+
+    since = previous.get("exported_at")
+    if full or not since or previous.get("menu") != menu or previous.get("assets") != assets:
+        return all_urls, all_urls, counts, menu, assets
+    since = datetime.fromisoformat(since)
+    old_counts = previous.get("counts", {})
+
+    changed = {}
+    for m in _all_models():
+        ids = _changed_ids(m, since)
+        if ids or old_counts.get(m.__tablename__) != counts[m.__tablename__]:
+            changed[m] = ids
+
+    if any(m in changed for m in GLOBAL_MODELS):
+        return all_urls, all_urls, counts, menu, assets
+
+    todo = {u for u in all_urls if u not in previous.get("routes", {})}
+    for url, models_read in list_routes.items():
+        if models_read is None or any(m in changed for m in models_read):
+            todo.add(url)
+
+    for url, (d, row_id) in detail_urls.items():
+        if row_id in changed.get(d.model, ()):
+            todo.add(url)
+    for d in DETAIL_ROUTES:
+        for other, fk in d.related.items():
+            ids = changed.get(other)
+            if ids:
+                owners = {o for (o,) in db.session.query(fk).filter(other.id.in_(ids))}
+                todo.update(u for u, (dd, rid) in detail_urls.items() if dd is d and rid in owners)
+
+    return all_urls, sorted(todo), counts, menu, assets
+
+
+# --- rendering (runs in worker processes) ---------------------------------
+
+_worker_app = None
+
+
+def _init_worker():
+    global _worker_app
+    from . import create_app
+    _worker_app = create_app()
+
+
+def _render(app, urls, out_dir):
+    client = app.test_client()
+    results = []
+    for url in urls:
+        resp = client.get(url)
+        if resp.status_code != 200:
+            results.append((url, resp.status_code))
+            continue
+        target = os.path.join(out_dir, output_path(url))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = target + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(resp.get_data())
+        os.replace(tmp, target)  # never expose a half-written page to Nginx
+        results.append((url, 200))
+    return results
+
+
+def _render_in_worker(args):
+    urls, out_dir = args
+    return _render(_worker_app, urls, out_dir)
+
+
+def _sync_static(out_dir):
+    src = current_app.static_folder
+    dst = os.path.join(out_dir, "static")
+    for root, _dirs, files in os.walk(src):
+        for name in files:
+            s = os.path.join(root, name)
+            d = os.path.join(dst, os.path.relpath(s, src))
+            if os.path.exists(d) and os.path.getmtime(d) >= os.path.getmtime(s):
+                continue
+            os.makedirs(os.path.dirname(d), exist_ok=True)
+            shutil.copy2(s, d)
+
+
+def export_site(out_dir: str, full: bool = False, jobs: int = 1, with_static: bool = False) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    state_path = os.path.join(out_dir, STATE_FILE)
+    previous = {}
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as fh:
+            previous = json.load(fh)
+
+    started = datetime.utcnow()  # same clock as TimestampMixin
+    all_urls, todo, counts, menu, assets = plan(previous, full=full)
+
+    if jobs > 1 and len(todo) > 1:
+        chunks = [todo[i::jobs] for i in range(jobs)]
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+            results = [r for part in pool.map(_render_in_worker, [(c, out_dir) for c in chunks]) for r in part]
+    else:
+        results = _render(current_app._get_current_object(), todo, out_dir)
+
+    failed = [(u, status) for u, status in results if status != 200]
+    rendered = {u for u, status in results if status == 200}
+
+    # Pages whose rows were deleted or unpublished, and pages that failed to
+    # render: their old file would keep being served, so Nginx falls back to
+    # Flask for them instead (they are left out of the route map and retried
+    # on the next export)
+    removed = [u for u in previous.get("routes", {}) if u not in all_urls]
+    for url in removed + [u for u, _status in failed]:
+        try:
+            os.remove(os.path.join(out_dir, output_path(url)))
+        except FileNotFoundError:
+            pass
+
+    routes = {u: output_path(u) for u in all_urls
+              if u in rendered or (u in previous.get("routes", {}) and u not in todo)}
+    with open(os.path.join(out_dir, ROUTE_MAP), "w", encoding="utf-8") as fh:
+        json.dump(routes, fh, indent=1, sort_keys=True)
+    with open(state_path, "w", encoding="utf-8") as fh:
+        json.dump({"exported_at": started.isoformat(), "counts": counts, "menu": menu,
+                   "assets": assets, "routes": routes}, fh, indent=1)
+
+    if with_static:
+        _sync_static(out_dir)
+
+    return {"rendered": len(rendered), "skipped": len(all_urls) - len(todo),
+            "removed": len(removed), "failed": failed}
@@ -0,0 +1,9 @@
+"""
+Load benchmarks for the department site.
+
+    python -m bench generate --db sqlite:///bench.db --scale 1
+    python -m bench run --db sqlite:///bench.db --save baseline
+    python -m bench run --db sqlite:///bench.db --compare baseline
+
+See bench/__main__.py for all options.
+"""
@@ -0,0 +1,161 @@
+"""
+python -m bench <command>
+
+  generate   fill a database with synthetic content
+             --db URL  --scale 1.0  --seed 42
+  run        drive the mixed workload and print per-route numbers
+             --db URL  --mode inproc|gunicorn|waitress|http  --url (for http)
+             --requests N | --duration S  --concurrency C  --warmup N
+             --no-response-cache  --save NAME  --compare NAME  --threshold 0.2
+  compare    compare two stored results: compare BASE CURRENT
+
+`--db` defaults to sqlite:///<repo>/instance/bench.db, never the site database.
+Exit status is 1 when --compare finds a regression.
+"""
+import argparse
+import os
+import platform
+import subprocess
+import sys
+
+from bench import report
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = "sqlite:///" + os.path.join(REPO_ROOT, "instance", "bench.db")
+
+
+def _app_env(args):
+    env = {"DATABASE_URL": args.db, "INSTRUMENTATION_ENABLED": "1"}
+    if getattr(args, "no_response_cache", False):
+        env["RESPONSE_CACHE_ENABLED"] = "0"
+    return env
+
+
+def _create_app():
+    from app import create_app
+    return create_app()
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_generate(args):
+    from app.provision import provision
+    from bench.synthetic import generate
+
+    app = _create_app()
+    provision(app)
+    with app.app_context():
+        counts = generate(scale=args.scale, seed=args.seed)
+    print(f"Generated into {args.db}:")
+    for name, n in counts.items():
+        print(f"  {name:<18}{n:>9}")
+
+
+def cmd_run(args):
+    from bench import workload
+
+    app = _create_app()
+    with app.app_context():
+        pools = workload.load_pools(seed=args.seed)
+    scenarios = workload.default_scenarios(pools)
+    run_kwargs = dict(requests=args.requests, duration=args.duration, concurrency=args.concurrency,
+                      warmup=args.warmup, revalidate=args.revalidate, seed=args.seed)
+
+    if args.mode == "inproc":
+        samples, wall = workload.run(workload.InProcessDriver(app), scenarios, **run_kwargs)
+    elif args.mode == "http":
+        if not args.url:
+            sys.exit("--mode http needs --url")
+        samples, wall = workload.run(workload.HttpDriver(args.url), scenarios, **run_kwargs)
+    else:
+        from bench.server import serve
+        with serve(args.mode, _app_env(args), workers=args.workers, threads=args.threads) as url:
+            samples, wall = workload.run(workload.HttpDriver(url), scenarios, **run_kwargs)
+
+    result = report.summarize(samples, wall, {
+        "mode": args.mode, "db": app.config["SQLALCHEMY_DATABASE_URI"].split("://")[0],
+        "concurrency": args.concurrency, "seed": args.seed, "warmup": args.warmup,
+        "revalidate": args.revalidate, "response_cache": not args.no_response_cache,
+        "workers": args.workers if args.mode == "gunicorn" else None,
+        "git": _git_rev(), "python": platform.python_version(), "machine": platform.node(),
+    })
+    print(report.format_table(result))
+
+    if args.save:
+        print(f"\nSaved {report.save(result, args.save)}")
+    if args.compare:
+        return _check(report.load(args.compare), result, args.threshold)
+
+
+def _check(baseline, current, threshold):
+    print()
+    print(report.format_comparison(baseline, current))
+    problems = report.compare(baseline, current, threshold=threshold)
+    if problems:
+        print(f"\nREGRESSION (threshold {threshold:.0%}):")
+        for p in problems:
+            print(f"  {p}")
+        return 1
+    print(f"\nNo regressions (threshold {threshold:.0%}).")
+    return 0
+
+
+def cmd_compare(args):
+    return _check(report.load(args.baseline), report.load(args.current), args.threshold)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Site load benchmarks.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="fill a database with synthetic content")
+    gen.add_argument("--db", default=DEFAULT_DB)
+    gen.add_argument("--scale", type=float, default=1.0)
+    gen.add_argument("--seed", type=int, default=42)
+    gen.set_defaults(func=cmd_generate)
+
+    run = sub.add_parser("run", help="run the mixed workload")
+    run.add_argument("--db", default=DEFAULT_DB)
+    run.add_argument("--mode", choices=("inproc", "gunicorn", "waitress", "http"), default="inproc")
+    run.add_argument("--url", help="base URL for --mode http")
+    run.add_argument("--requests", type=int)
+    run.add_argument("--duration", type=float)
+    run.add_argument("--concurrency", type=int, default=4)
+    run.add_argument("--warmup", type=int, default=200)
+    run.add_argument("--revalidate", type=float, default=0.3)
+    run.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    run.add_argument("--threads", type=int, default=4, help="server threads per worker")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--no-response-cache", action="store_true")
+    run.add_argument("--save", metavar="NAME")
+    run.add_argument("--compare", metavar="NAME")
+    run.add_argument("--threshold", type=float, default=0.2)
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="compare two stored results")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.2)
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    if "db" in args:
+        # app.config reads the environment at import time, so set it before anything imports app
+        if "app" in sys.modules:
+            sys.exit("bench: the app package was imported before --db was applied")
+        os.environ.update(_app_env(args))
+        if REPO_ROOT not in sys.path:
+            sys.path.insert(0, REPO_ROOT)
+    if args.command == "run" and not (args.requests or args.duration):
+        args.requests = 2000
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
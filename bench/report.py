@@ -0,0 +1,120 @@
+"""
+Summaries, stored baselines and the regression check.
+
+A result is plain JSON:
+
+    {"meta": {...}, "total": {...}, "routes": {"home": {"count", "rps", "p50",
+     "p95", "p99", "mean", "queries", "errors", "not_modified"}, ...}}
+
+Baselines live in bench/baselines/<name>.json.
+"""
+import json
+import math
+import os
+from collections import defaultdict
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _stats(samples, wall):
+    ms = sorted(s.ms for s in samples)
+    queries = [s.queries for s in samples if s.queries is not None and s.status == 200]
+    return {
+        "count": len(samples),
+        "rps": round(len(samples) / wall, 1) if wall else 0.0,
+        "p50": round(percentile(ms, 50), 2),
+        "p95": round(percentile(ms, 95), 2),
+        "p99": round(percentile(ms, 99), 2),
+        "mean": round(sum(ms) / len(ms), 2) if ms else 0.0,
+        "queries": round(sum(queries) / len(queries), 2) if queries else None,
+        "errors": sum(1 for s in samples if s.status >= 500),
+        "not_modified": sum(1 for s in samples if s.status == 304),
+    }
+
+
+def summarize(samples, wall, meta):
+    by_route = defaultdict(list)
+    for s in samples:
+        by_route[s.scenario].append(s)
+    return {
+        "meta": dict(meta, wall_seconds=round(wall, 2)),
+        "total": _stats(samples, wall),
+        "routes": {name: _stats(rows, wall) for name, rows in sorted(by_route.items())},
+    }
+
+
+def format_table(result):
+    head = f"{'route':<16}{'n':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'304':>6}{'5xx':>5}"
+    lines = [head, "-" * len(head)]
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for name, r in rows:
+        q = "-" if r["queries"] is None else f"{r['queries']:.1f}"
+        lines.append(f"{name:<16}{r['count']:>7}{r['rps']:>9.1f}{r['p50']:>9.1f}{r['p95']:>9.1f}"
+                     f"{r['p99']:>9.1f}{q:>9}{r['not_modified']:>6}{r['errors']:>5}")
+    return "\n".join(lines)
+
+
+def baseline_path(name):
+    return name if name.endswith(".json") else os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save(result, name):
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    return path
+
+
+def load(name):
+    with open(baseline_path(name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=0.2, min_ms=2.0):
+    """
+    Return a list of regression messages (empty means pass).
+
+    A route regresses when its p95 grows by more than `threshold` (and by at
+    least `min_ms`, so sub-millisecond noise doesn't trip it), when it issues
+    more queries on average, or when it starts returning 5xx. Total throughput
+    dropping by more than `threshold` is also a regression.
+    """
+    problems = []
+    for name, base in baseline["routes"].items():
+        cur = current["routes"].get(name)
+        if not cur:
+            continue
+        if cur["p95"] > base["p95"] * (1 + threshold) and cur["p95"] - base["p95"] >= min_ms:
+            problems.append(f"{name}: p95 {base['p95']:.1f}ms -> {cur['p95']:.1f}ms")
+        if base["queries"] is not None and cur["queries"] is not None and cur["queries"] > base["queries"] + 0.5:
+            problems.append(f"{name}: queries {base['queries']:.1f} -> {cur['queries']:.1f}")
+        if cur["errors"] and not base["errors"]:
+            problems.append(f"{name}: {cur['errors']} server errors")
+
+    base_rps, cur_rps = baseline["total"]["rps"], current["total"]["rps"]
+    if base_rps and cur_rps < base_rps * (1 - threshold):
+        problems.append(f"throughput {base_rps:.1f} -> {cur_rps:.1f} req/s")
+    return problems
+
+
+def format_comparison(baseline, current):
+    lines = [f"{'route':<16}{'p95 base':>10}{'p95 now':>10}{'delta':>9}{'q base':>8}{'q now':>8}"]
+    for name, cur in current["routes"].items():
+        base = baseline["routes"].get(name)
+        if not base:
+            continue
+        delta = (cur["p95"] / base["p95"] - 1) * 100 if base["p95"] else 0.0
+        qb = "-" if base["queries"] is None else f"{base['queries']:.1f}"
+        qc = "-" if cur["queries"] is None else f"{cur['queries']:.1f}"
+        lines.append(f"{name:<16}{base['p95']:>10.1f}{cur['p95']:>10.1f}{delta:>+8.0f}%{qb:>8}{qc:>8}")
+    lines.append(f"{'throughput':<16}{baseline['total']['rps']:>10.1f}{current['total']['rps']:>10.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,54 @@
+"""Start gunicorn or waitress on a local port for the HTTP driver."""
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _command(kind, port, workers, threads):
+    if kind == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}",
+                "--workers", str(workers), "--threads", str(threads), "--log-level", "warning",
+                "wsgi:app"]
+    if kind == "waitress":
+        return [sys.executable, "-m", "waitress", f"--listen=127.0.0.1:{port}",
+                f"--threads={threads}", "wsgi:app"]
+    raise ValueError(f"unknown server {kind!r}")
+
+
+@contextmanager
+def serve(kind, env, workers=2, threads=4, timeout=60):
+    """Yield the base URL of a running server; stop it on exit."""
+    port = _free_port()
+    proc = subprocess.Popen(_command(kind, port, workers, threads), cwd=REPO_ROOT,
+                            env=dict(os.environ, **env))
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{kind} exited with {proc.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{kind} did not start within {timeout}s")
+                time.sleep(0.2)
+        yield base
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
@@ -0,0 +1,151 @@
+"""
+Deterministic synthetic content for every model in app/models.py.
+
+The same --seed and --scale always produce the same rows, so numbers from
+two runs are comparable. Rows are inserted with Core executemany in batches
+(no ORM identity map), then the search index is rebuilt once.
+"""
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, insert
+
+from app.extensions import db
+from app.models import (
+    SiteSettings, Page, Program, Faculty, News, Event, Achievement,
+    FundedProject, MoU, PlacementStat, Newsletter, Enquiry, GalleryAlbum,
+    GalleryImage, Alumni, HeroSlide, ImageVariant,
+)
+
+# Row counts at --scale 1
+BASE_COUNTS = {
+    "news": 20000,
+    "events": 5000,
+    "faculty": 300,
+    "albums": 500,
+    "images_per_album": 200,
+    "enquiries": 100000,
+    "alumni": 10000,
+    "projects": 2000,
+    "pages": 200,
+    "newsletters": 300,
+    "achievements": 1000,
+    "mous": 150,
+}
+
+GALLERY_FILES = ("/static/images/gallery/DSC_0327.webp", "/static/images/gallery/DSC_0493.webp",
+                 "/static/images/gallery/DSC_2667.webp")
+
+BATCH = 5000
+EPOCH = datetime(2015, 1, 1)
+
+WORDS = ("intelligent systems machine learning data robotics vision language model research "
+         "students faculty workshop seminar industry project award lab campus placement "
+         "neural network edge computing ethics healthcare analytics agents optimisation").split()
+
+
+def _text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _html(rng, paragraphs):
+    return "".join(f"<p>{_text(rng, rng.randint(40, 120))}</p>" for _ in range(paragraphs))
+
+
+def _when(rng, days=3650):
+    return EPOCH + timedelta(days=rng.randrange(days), seconds=rng.randrange(86400))
+
+
+def _insert(model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH:
+            db.session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+
+
+def _stamped(rng, row):
+    ts = _when(rng)
+    row.setdefault("created_at", ts)
+    row.setdefault("updated_at", ts)
+    return row
+
+
+def counts_for(scale: float) -> dict:
+    return {k: max(1, int(v * scale)) for k, v in BASE_COUNTS.items()}
+
+
+def generate(scale: float = 1.0, seed: int = 42, reset: bool = True) -> dict:
+    """Fill the current app's database. Returns the row counts written."""
+    rng = random.Random(seed)
+    n = counts_for(scale)
+
+    if reset:
+        for model in (GalleryImage, GalleryAlbum, ImageVariant, Enquiry, News, Event, Faculty,
+                      Alumni, FundedProject, Page, Newsletter, Achievement, MoU, PlacementStat,
+                      Program, HeroSlide, SiteSettings):
+            db.session.execute(delete(model))
+
+    _insert(SiteSettings, [_stamped(rng, {"id": 1})])
+
+    _insert(HeroSlide, (_stamped(rng, {"image_url": "/static/images/headers/header_image.jpg",
+                                       "title": _text(rng, 4), "order": i, "is_active": True})
+                        for i in range(5)))
+    _insert(Program, (_stamped(rng, {"level": lvl, "name": f"{lvl} {_text(rng, 3)}",
+                                     "overview_html": _html(rng, 2)})
+                      for lvl in ("UG", "PG", "Research") for _ in range(4)))
+    _insert(PlacementStat, (_stamped(rng, {"label": _text(rng, 2), "value": f"{rng.randint(3, 40)} LPA"})
+                            for _ in range(6)))
+    _insert(Page, (_stamped(rng, {"slug": "about" if i == 0 else f"page-{i}", "title": _text(rng, 3),
+                                  "body_html": _html(rng, rng.randint(3, 12)),
+                                  "show_in_menu": i in (1, 2)})
+                   for i in range(n["pages"])))
+    _insert(News, (_stamped(rng, {"slug": f"news-{i}", "title": _text(rng, 8),
+                                  "summary": _text(rng, 30), "body_html": _html(rng, rng.randint(4, 15)),
+                                  "published_on": (EPOCH + timedelta(days=rng.randrange(3650))).date(),
+                                  "is_published": rng.random() > 0.05})
+                   for i in range(n["news"])))
+    _insert(Event, (_stamped(rng, {"title": _text(rng, 6), "starts_at": _when(rng),
+                                   "description_html": _html(rng, 2), "is_published": True})
+                    for _ in range(n["events"])))
+    _insert(Faculty, (_stamped(rng, {"name": _text(rng, 2).title(), "display_order": i,
+                                     "specialization": _text(rng, 4), "bio_html": _html(rng, 3)})
+                      for i in range(n["faculty"])))
+    _insert(Alumni, (_stamped(rng, {"name": _text(rng, 2).title(),
+                                    "graduation_year": str(2005 + rng.randrange(20)),
+                                    "organization": _text(rng, 2), "profile_html": _html(rng, 1)})
+                     for _ in range(n["alumni"])))
+    _insert(FundedProject, (_stamped(rng, {"title": _text(rng, 7), "summary": _text(rng, 60)})
+                            for _ in range(n["projects"])))
+    _insert(Newsletter, (_stamped(rng, {"title": _text(rng, 5), "issue": f"Vol {i // 12 + 1}, Issue {i % 12 + 1}",
+                                        "published_on": date(2010, 1, 1) + timedelta(days=30 * i)})
+                         for i in range(n["newsletters"])))
+    _insert(Achievement, (_stamped(rng, {"title": _text(rng, 6), "description": _text(rng, 40),
+                                         "is_featured": rng.random() < 0.1})
+                          for _ in range(n["achievements"])))
+    _insert(MoU, (_stamped(rng, {"partner_name": _text(rng, 2).title(), "area": _text(rng, 3)})
+                  for _ in range(n["mous"])))
+    _insert(Enquiry, (_stamped(rng, {"name": _text(rng, 2), "email": f"user{i}@example.com",
+                                     "message": _text(rng, 50),
+                                     "status": rng.choice(("New", "New", "In Progress", "Closed"))})
+                      for i in range(n["enquiries"])))
+
+    _insert(GalleryAlbum, (_stamped(rng, {"id": a + 1, "title": _text(rng, 4), "year": str(2015 + a % 10)})
+                           for a in range(n["albums"])))
+    _insert(GalleryImage, (_stamped(rng, {"album_id": a + 1,
+                                          "image_url": rng.choice(GALLERY_FILES),
+                                          "caption": _text(rng, 3)})
+                           for a in range(n["albums"]) for i in range(n["images_per_album"])))
+    db.session.commit()
+
+    # Core inserts skip the save hooks: fill the rendered rich-text columns in bulk
+    from app.rich_text import render_all
+    render_all()
+    db.session.commit()
+
+    from app.search import reindex_all
+    reindex_all()
+    return n
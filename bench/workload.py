@@ -0,0 +1,186 @@
+"""
+Scripted mixed workload against the WSGI app.
+
+A workload is a weighted list of scenarios; each picks a concrete URL from
+pools sampled out of the benchmark database, so the mix is reproducible for a
+given --seed. Two drivers share the same loop:
+
+- InProcessDriver: Flask test_client, no sockets (measures the app itself)
+- HttpDriver:      keep-alive http.client against gunicorn/waitress
+
+Per-request query counts come from the app's Server-Timing header
+(`db;...;desc="N queries"`), so they work for both drivers.
+"""
+import http.client
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlencode, urlsplit
+
+Scenario = namedtuple("Scenario", "name weight method build")
+Sample = namedtuple("Sample", "scenario status ms queries")
+
+_QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+SEARCH_TERMS = ("intelligent", "robotics", "machine learning", "workshop", "placement",
+                "vision", "research lab", "healthcare analytics")
+
+
+def load_pools(limit=500, seed=42):
+    """Slugs/ids to pick detail URLs from (needs an app context)."""
+    from app.models import GalleryAlbum, News, Page
+
+    rng = random.Random(seed)
+
+    def pick(rows):
+        rows = [r[0] for r in rows]
+        return rng.sample(rows, min(limit, len(rows))) if rows else []
+
+    return {
+        "news": pick(News.query.with_entities(News.slug).filter_by(is_published=True).all()),
+        "pages": pick(Page.query.with_entities(Page.slug).filter_by(is_published=True).all()),
+        "albums": pick(GalleryAlbum.query.with_entities(GalleryAlbum.id).filter_by(is_published=True).all()),
+    }
+
+
+def default_scenarios(pools):
+    def detail(prefix, pool, fallback):
+        return (lambda rng: f"{prefix}{rng.choice(pool)}") if pool else (lambda rng: fallback)
+
+    def contact_form(rng):
+        n = rng.randrange(10 ** 6)
+        return "/contact", {"name": f"Bench {n}", "email": f"bench{n}@example.com",
+                            "message": "Benchmark enquiry"}
+
+    return [
+        Scenario("home", 25, "GET", lambda rng: "/"),
+        Scenario("news_list", 10, "GET", lambda rng: "/news"),
+        Scenario("news_detail", 15, "GET", detail("/news/", pools["news"], "/news")),
+        Scenario("events", 6, "GET", lambda rng: "/events"),
+        Scenario("faculty", 6, "GET", lambda rng: "/faculty"),
+        Scenario("gallery", 6, "GET", lambda rng: "/gallery"),
+        Scenario("gallery_album", 8, "GET", detail("/gallery/", pools["albums"], "/gallery")),
+        Scenario("page", 5, "GET", detail("/p/", pools["pages"], "/about")),
+        Scenario("static_pages", 8, "GET",
+                 lambda rng: rng.choice(("/about", "/academics", "/research", "/placements",
+                                         "/newsletter", "/alumni", "/contact"))),
+        Scenario("search", 10, "GET",
+                 lambda rng: "/search?" + urlencode({"q": rng.choice(SEARCH_TERMS)})),
+        Scenario("contact_post", 1, "POST", contact_form),
+    ]
+
+
+class InProcessDriver:
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, url, data=None, headers=None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        resp = client.open(url, method=method, data=data, headers=headers or {})
+        resp.close()
+        return resp.status_code, resp.headers
+
+
+class HttpDriver:
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return conn
+
+    def request(self, method, url, data=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        for attempt in (0, 1):
+            conn = self._conn()
+            try:
+                conn.request(method, url, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                return resp.status, resp.headers
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+
+def run(driver, scenarios, requests=None, duration=None, concurrency=1, warmup=0,
+        revalidate=0.3, seed=42):
+    """
+    Drive the workload and return (samples, wall_seconds).
+
+    `revalidate` is the share of GETs sent with If-None-Match for a URL the
+    worker has already seen, like a returning browser.
+    """
+    names = [s.name for s in scenarios]
+    weights = [s.weight for s in scenarios]
+    by_name = {s.name: s for s in scenarios}
+
+    samples = []
+    lock = threading.Lock()
+    counter = iter(range(requests)) if requests else None
+    deadline = None
+
+    def one(rng, etags, record):
+        scenario = by_name[rng.choices(names, weights)[0]]
+        built = scenario.build(rng)
+        url, data = built if isinstance(built, tuple) else (built, None)
+        headers = {}
+        if scenario.method == "GET" and url in etags and rng.random() < revalidate:
+            headers["If-None-Match"] = etags[url]
+
+        t0 = time.perf_counter()
+        status, resp_headers = driver.request(scenario.method, url, data=data, headers=headers)
+        ms = (time.perf_counter() - t0) * 1000
+
+        if resp_headers.get("ETag"):
+            etags[url] = resp_headers["ETag"]
+        m = _QUERIES_RE.search(resp_headers.get("Server-Timing", ""))
+        if record:
+            return Sample(scenario.name, status, ms, int(m.group(1)) if m else None)
+
+    def worker(idx):
+        rng = random.Random(seed * 1000 + idx)
+        etags = {}
+        local = []
+        while True:
+            if counter is not None:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+            elif time.perf_counter() >= deadline:
+                break
+            local.append(one(rng, etags, record=True))
+        with lock:
+            samples.extend(local)
+
+    if not requests and not duration:
+        raise ValueError("give requests or duration")
+
+    warm_rng = random.Random(seed - 1)
+    for _ in range(warmup):
+        one(warm_rng, {}, record=False)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    if duration:
+        deadline = t0 + duration
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - t0
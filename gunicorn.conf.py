@@ -0,0 +1,42 @@
+"""
+Gunicorn settings: gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is imported once in the master (preload_app) and workers fork from
+it, so each worker is ready in milliseconds. create_app() does not touch the
+database; run `flask --app wsgi init-db` once per deploy before starting.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+threads = int(os.getenv("GUNICORN_THREADS", "2"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    from wsgi import app
+
+    timings = app.extensions.get("startup", {})
+    server.log.info("App imported in %s ms, initialised in %s ms (preload=%s)",
+                    timings.get("import_ms"), timings.get("init_ms"), preload_app)
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared across processes
+    from app.extensions import db
+    from wsgi import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    # Same for the content-version file: an fd inherited from the master shares
+    # its open file description, so flock wouldn't exclude other workers' bumps.
+    # close() here only drops this worker's copy; it reopens on first use.
+    registry = app.extensions.get("content_versions")
+    if registry is not None:
+        registry.close()
@@ -1,4 +1,8 @@
 import os
+
+# Local development: create tables and the first admin on startup
+os.environ.setdefault("AUTO_PROVISION", "1")
+
 from app import create_app
 from waitress import serve
 
@@ -1,8 +1,10 @@
 from app import create_app
 from app.extensions import db
 from app.models import SiteSettings, Program, Page, PlacementStat, MoU
+from app.provision import provision
 
 app = create_app()
+provision(app)
 
 with app.app_context():
     s = SiteSettings.query.first()